@@ -61,7 +61,9 @@ __license__ = 'MIT'
 def dorunrun(command:Union[str, list],
     timeout:int=None,
     return_datatype:type=dict,
-    OK_values:Iterable = (0,)) -> Union[str, bool, int, dict]:
+    OK_values:Iterable = (0,),
+    close_fds:bool = True,
+    input:str = "") -> Union[str, bool, int, dict]:
     """
     A wrapper around (almost) all the complexities of running child
         processes.
@@ -82,6 +84,12 @@ def dorunrun(command:Union[str, list],
         The default data type is dict
     OK_values: By default, OK means zero. However, the caller can supply a group
         of codes that are interpreted as being acceptable.
+    close_fds: Passed to subprocess. False lets Python start the child with
+        posix_spawn (when command[0] is a path) instead of fork+exec.
+        Python's own descriptors are non-inheritable, so it is only unsafe
+        if the caller has marked descriptors inheritable on purpose.
+    input: Text written to the child's stdin. Empty by default, so the
+        child never waits on the terminal.
 
     ----------
     Returns: A value corresponding to the requested info.
@@ -105,11 +113,12 @@ def dorunrun(command:Union[str, list],
     try:
         result = subprocess.run(command,
             timeout=timeout,
-            input="",
+            input=input,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
             text=True,
-            shell=False)
+            shell=False,
+            close_fds=close_fds)
         i_code = code = result.returncode
         b_code = code in OK_values
         s = result.stdout[:-1] if result.stdout.endswith('\n') else result.stdout
@@ -129,11 +138,17 @@ def dorunrun(command:Union[str, list],
                     "stderr":e}
 
     except subprocess.TimeoutExpired as e:
+        # Keep whatever the child wrote before it was killed. subprocess
+        # hands it back as bytes (or None), whatever text= says.
+        s, e = [_.decode(errors='replace') if isinstance(_, bytes) else _ or ""
+                for _ in (e.stdout, e.stderr)]
+        s = s[:-1] if s.endswith('\n') else s
+        e = e[:-1] if e.endswith('\n') else e
         return {"OK":False,
                 "code":255,
                 "name":ExitCode(255).name if 255 in ExitCode else "EXIT_255",
-                "stdout":"",
-                "stderr":""}
+                "stdout":s,
+                "stderr":e}
 
     except Exception as e:
         raise Exception(f"Unexpected error: {str(e)}")
@@ -11,19 +11,51 @@ from typing import *
 min_py = (3, 9)
 
 import argparse
+import asyncio
+import concurrent.futures
+import dataclasses
 import datetime
+import errno
+import functools
+import io
+import ipaddress
 import os
 import pathlib
+import re
+import selectors
+import shlex
+import shutil
+import smtplib
 import socket
 import sys
+import threading
 import time
-import tomli as toml  # Changed from 'toml' to 'tomli' for compatibility
+import types
+
+# tomllib is in the standard library from 3.11; tomli is the same parser
+try:
+    import tomllib
+except ImportError:
+    import tomli as tomllib
+
+# Optional: persistent SSH sessions (ssh_backend = 'paramiko')
+try:
+    import paramiko
+    have_paramiko = True
+except ImportError:
+    have_paramiko = False
+
+# Optional: persistent SSH sessions without a thread per read (ssh_backend = 'asyncssh')
+try:
+    import asyncssh
+    have_asyncssh = True
+except ImportError:
+    have_asyncssh = False
 
 # Import hpclib modules
 from dorunrun import dorunrun, ExitCode
 from linuxutils import *
 from nas_monitor_dbclass import NASMonitorDB
-from sqlitedb import SQLiteDB
 from urdecorators import trap
 from urlogger import URLogger
 
@@ -32,6 +64,111 @@ myconfig = None
 logger = None
 db = None
 
+# Neither changes while the monitor runs
+mynetid = os.environ.get('USER', 'unknown')
+myhost = socket.gethostname()
+
+@dataclasses.dataclass(frozen=True)
+class MonitorCtx:
+    """
+    The configuration, logger and database a monitoring cycle works with,
+    passed explicitly from main() instead of read from the globals above.
+    Frozen, so worker threads can share one instance without locking.
+    __slots__ is spelled out because dataclass(slots=True) needs 3.10.
+    """
+    __slots__ = ('cfg', 'logger', 'db')
+    cfg: types.SimpleNamespace
+    logger: URLogger
+    db: NASMonitorDB
+
+@dataclasses.dataclass
+class Workstation:
+    """One entry of the workstations list in the configuration."""
+    __slots__ = ('host', 'mounts')
+    host: str
+    mounts: List[str]
+
+# Separates remount output from the verifying 'mount -av' in one SSH session
+REMOUNT_MARKER = '===NAS_MONITOR_VERIFY==='
+
+# Distinct logged-in users, one per line
+USERS_COMMAND = "who | cut -d' ' -f1 | sort -u"
+
+# Section headers in gather_workstation_state()'s combined probe output
+PROBE_MARKER = '---NAS_MONITOR:{}---'
+PROBE_MARKER_RE = re.compile(
+    '^' + re.escape(PROBE_MARKER).replace(r'\{\}', r'(\w+)') + r'$\n?', re.MULTILINE)
+
+# hostname -> (address, expiry on the time.monotonic() clock)
+_dns_cache = {}
+DEFAULT_DNS_CACHE_TTL = 900
+
+# hostname -> connected paramiko.SSHClient, reused across commands and cycles
+_ssh_pool = {}
+
+# Workstations reached through the ssh binary; close_ssh_pool() asks each
+# one's ControlMaster to exit
+_ssh_masters = set()
+
+# Guards _ssh_pool and _ssh_masters: close_ssh_pool() can run while checks
+# abandoned at the cycle deadline are still adding to them
+_ssh_pool_lock = threading.Lock()
+
+# asyncssh connections live on one event loop in a background thread;
+# _async_conns (hostname -> SSHClientConnection) is only touched from it
+_async_loop = None
+_async_loop_lock = threading.Lock()
+_async_conns = {}
+
+# SMTP session kept open between notifications; see _get_smtp()
+_smtp_conn = None
+
+# Workstations checked concurrently when max_parallel is not configured
+DEFAULT_MAX_PARALLEL = 8
+
+# Seconds a cycle waits for its workstation checks; None waits for all
+DEFAULT_CYCLE_DEADLINE = None
+
+# Reachability is a TCP connect to the SSH port, given this many seconds
+DEFAULT_SSH_PORT = 22
+DEFAULT_ONLINE_TIMEOUT = 2
+
+# Seconds one remote path test may block. A stale hard NFS mount hangs
+# anything that stats it; this keeps one such path from eating the whole
+# probe's ssh_timeout
+DEFAULT_PATH_TIMEOUT = 10
+
+# Seconds any one SMTP operation may block; the session is kept between
+# cycles, and a half-open one must not stall the monitor loop
+DEFAULT_SMTP_TIMEOUT = 30
+
+# Added to ssh_options (unless ssh_multiplex = false) so every command to a
+# workstation after the first rides one authenticated master connection
+SSH_MULTIPLEX_OPTIONS = [
+    '-o', 'ControlMaster=auto',
+    '-o', 'ControlPath=~/.ssh/cm-%r@%h:%p',
+    '-o', 'ControlPersist=10m',
+    # A master on a dead TCP connection (suspended host, firewall
+    # timeout) exits after about a minute instead of hanging every command
+    '-o', 'ServerAliveInterval=30',
+    '-o', 'ServerAliveCountMax=2'
+]
+
+# Substrings of a lowercased error that classify_mount_issue() takes as a
+# connectivity problem, then as a mount problem; each list is compiled
+# into one alternation so an error is scanned once per list
+CONNECTIVITY_INDICATORS = [
+    'ssh', 'connection', 'timeout', 'refused', 'closed',
+    'no route', 'unreachable', 'offline', 'timed out',
+    'cannot connect', 'connection reset', 'broken pipe'
+]
+MOUNT_INDICATORS = [
+    'mount point', 'not mounted', 'stale', 'permission denied',
+    'no such file', 'device not'
+]
+CONNECTIVITY_RE = re.compile('|'.join(map(re.escape, CONNECTIVITY_INDICATORS)))
+MOUNT_ERROR_RE = re.compile('|'.join(map(re.escape, MOUNT_INDICATORS)))
+
 def classify_mount_issue(workstation: str, error_msg: str = "") -> tuple:
     """
     Classify if the issue is connectivity-related or an actual mount failure.
@@ -61,268 +198,720 @@ def classify_mount_issue(workstation: str, error_msg: str = "") -> tuple:
         return ('config_info', 'info', 'HIV_flaps nested mount configuration (working as designed)')
     
     # Check for connectivity indicators
-    connectivity_indicators = [
-        'ssh', 'connection', 'timeout', 'refused', 'closed',
-        'no route', 'unreachable', 'offline', 'timed out',
-        'cannot connect', 'connection reset', 'broken pipe'
-    ]
-    
-    if any(indicator in error_lower for indicator in connectivity_indicators):
+    if CONNECTIVITY_RE.search(error_lower):
         return ('connectivity', 'warning', f'Connection issue: {error_msg[:100]}')
     
     # Check for mount-specific errors (but not "Protocol not supported")
-    mount_indicators = [
-        'mount point', 'not mounted', 'stale', 'permission denied',
-        'no such file', 'device not'
-    ]
-    
-    if any(indicator in error_lower for indicator in mount_indicators):
+    if MOUNT_ERROR_RE.search(error_lower):
         return ('mount_failure', 'critical', f'Mount error: {error_msg[:100]}')
     
     # Default to mount failure for unknown errors
     return ('mount_failure', 'critical', f'Mount verification failed: {error_msg[:100]}')
 
-@trap
-def is_host_online(hostname: str) -> bool:
+def cycle_timestamp() -> str:
     """
-    Check if a host is reachable via ping.
+    Current time in the UTC 'YYYY-MM-DD HH:MM:SS' form SQLite's
+    CURRENT_TIMESTAMP uses, so it compares correctly with existing rows.
     """
-    global myconfig
+    return datetime.datetime.now(datetime.timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _to_namespace(d: Dict) -> types.SimpleNamespace:
+    """
+    Recursively convert TOML tables to SimpleNamespace for dot notation.
+    Arrays (e.g. critical_software) are left as lists of dicts.
+    """
+    return types.SimpleNamespace(**{
+        k: _to_namespace(v) if isinstance(v, dict) else v
+        for k, v in d.items()
+    })
+
+def load_config(config_path: str) -> types.SimpleNamespace:
+    """
+    Load configuration from TOML file.
+    
+    Also precomputes _sw_plan, mapping each workstation to the
+    (mount_point, software_list) pairs it should verify, so the
+    per-host loop does not rescan critical_software every cycle, and
+    enables SSH connection multiplexing unless ssh_options already
+    configures ControlMaster. _ssh_prefix is the fixed start of every ssh
+    argv (with ssh's full path, so it can be posix_spawn'ed), a tuple
+    built here once instead of on each command. workstations becomes a
+    tuple of Workstation instances. _quiet_hours is a 168-byte mask,
+    indexed by weekday * 24 + hour, of the hours in which notifications
+    are suppressed.
+    """
+    # tomllib only reads binary files
+    with open(config_path, 'rb') as f:
+        config = _to_namespace(tomllib.load(f))
+    
+    config.workstations = tuple(Workstation(ws['host'], ws['mounts'])
+                                for ws in config.workstations)
+    
+    if (getattr(config, 'ssh_multiplex', True) and
+            not any('ControlMaster' in opt for opt in config.ssh_options)):
+        config.ssh_options = config.ssh_options + SSH_MULTIPLEX_OPTIONS
+    config._ssh_prefix = (shutil.which('ssh') or 'ssh', *config.ssh_options)
     
-    result = dorunrun(['ping', '-c', '2', '-W', '2', hostname], timeout=5)
-    return result['code'] == 0
+    config._quiet_hours = bytes(
+        _is_quiet_hour(config, weekday, hour)
+        for weekday in range(7) for hour in range(24)
+    )
+    
+    critical_software = getattr(config, 'critical_software', [])
+    config._sw_plan = {
+        ws.host: [(sw['mount'], sw['software']) for sw in critical_software
+                  if sw['mount'] in ws.mounts]
+        for ws in config.workstations
+    }
+    
+    return config
 
-@trap
-def get_mount_status(workstation: str) -> Tuple[bool, List[Dict], str]:
+def resolve(hostname: str) -> str:
     """
-    Get mount status from workstation using SSH 'mount -av' command.
+    Resolve hostname to an address, caching the answer for dns_cache_ttl
+    seconds so the reachability check and every SSH call in a cycle share
+    one lookup.
     
-    Special handling for "Protocol not supported" errors which are expected
-    for the HIV_flaps nested mount configuration.
+    Returns the hostname unchanged if it cannot be resolved; the caller's
+    command will then report the failure itself.
+    """
+    now = time.monotonic()
+    cached = _dns_cache.get(hostname)
+    if cached and cached[1] > now:
+        return cached[0]
     
-    Returns:
-        Tuple of (success, mount_list, error_message)
+    try:
+        address = socket.getaddrinfo(hostname, 22, type=socket.SOCK_STREAM)[0][4][0]
+    except (socket.gaierror, IndexError) as e:
+        logger.debug(f"Could not resolve {hostname}: {e}")
+        return hostname
+    
+    ttl = getattr(myconfig, 'dns_cache_ttl', DEFAULT_DNS_CACHE_TTL)
+    _dns_cache[hostname] = (address, now + ttl)
+    return address
+
+def warm_dns_cache(hostnames: Iterable[str],
+                   executor: concurrent.futures.Executor) -> None:
     """
-    global myconfig
+    Resolve every workstation in parallel at startup, so the first cycle
+    does not pay for the lookups one SSH call at a time.
+    """
+    list(executor.map(resolve, hostnames))
+    logger.debug(f"DNS cache warmed: {len(_dns_cache)} address(es)")
 
-    cmd = ['ssh'] + myconfig.ssh_options + [workstation, 'mount -av']
+def ssh_command(workstation: str, cmd_str: str) -> List[str]:
+    """
+    Build the ssh argv for running cmd_str on workstation.
     
+    The cached address is passed as HostName so ~/.ssh/config entries for
+    the workstation still match, and HostKeyAlias keeps known_hosts keyed
+    by the workstation name rather than its address.
+    """
+    return [*myconfig._ssh_prefix, *_ssh_target(workstation), cmd_str]
+
+def _ssh_target(workstation: str) -> Tuple[str, ...]:
+    """
+    The host part of an ssh argv: HostName/HostKeyAlias options for the
+    cached address (if it resolved) followed by the workstation name.
+    """
+    return _target_args(workstation, resolve(workstation))
+
+@functools.lru_cache(maxsize=None)
+def _target_args(workstation: str, address: str) -> Tuple[str, ...]:
+    """_ssh_target() for a known address, built once per address."""
+    if address == workstation:
+        return (workstation,)
+    
+    return ('-o', f'HostName={address}', '-o', f'HostKeyAlias={workstation}',
+            workstation)
+
+def _get_client(workstation: str) -> "paramiko.SSHClient":
+    """
+    Return a connected SSHClient for workstation, opening one the first
+    time and reconnecting if the pooled transport has gone inactive.
+    """
+    with _ssh_pool_lock:
+        client = _ssh_pool.get(workstation)
+    if client is not None:
+        transport = client.get_transport()
+        if transport is not None and transport.is_active():
+            return client
+        client.close()
+        with _ssh_pool_lock:
+            _ssh_pool.pop(workstation, None)
+    
+    # Honor the same ~/.ssh/config the ssh binary would read
+    host_config = {}
+    config_file = os.path.expanduser(getattr(myconfig, 'ssh_config_file', '~/.ssh/config'))
+    if os.path.exists(config_file):
+        ssh_config = paramiko.SSHConfig.from_path(config_file)
+        host_config = ssh_config.lookup(workstation)
+    
+    # Connect to the cached address but check the host key under the
+    # workstation name, as HostKeyAlias does for the ssh binary; a key
+    # missing from known_hosts is refused rather than added
+    port = int(host_config.get('port', 22))
+    sock = socket.create_connection((resolve(workstation), port),
+                                    timeout=myconfig.ssh_timeout)
+    client = paramiko.SSHClient()
+    client.load_system_host_keys()
+    client.set_missing_host_key_policy(paramiko.RejectPolicy())
     try:
-        result = dorunrun(cmd, timeout=myconfig.ssh_timeout)
+        client.connect(workstation,
+                       port=port,
+                       sock=sock,
+                       username=host_config.get('user'),
+                       key_filename=host_config.get('identityfile'),
+                       timeout=myconfig.ssh_timeout,
+                       allow_agent=True,
+                       look_for_keys=True)
+    except Exception:
+        client.close()
+        sock.close()
+        raise
+    with _ssh_pool_lock:
+        _ssh_pool[workstation] = client
+    return client
+
+def _async_run(coro) -> Any:
+    """
+    Run coro on the asyncssh event loop, starting the loop's thread on
+    first use, and wait for its result in the calling thread.
+    """
+    global _async_loop
+    
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = asyncio.new_event_loop()
+            threading.Thread(target=_async_loop.run_forever,
+                             name='asyncssh', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coro, _async_loop).result()
+
+async def _async_command(workstation: str, cmd_str: str, timeout: int = None,
+                         stdin: str = None) -> Dict:
+    """
+    Coroutine behind run_remote() for ssh_backend = 'asyncssh'. Opens the
+    workstation's connection the first time (reading the same ssh config
+    file as the ssh binary) and reuses it after that. Host keys are
+    checked against ~/.ssh/known_hosts, asyncssh's default.
+    """
+    conn = _async_conns.get(workstation)
+    try:
+        if conn is None or conn.is_closed():
+            config_file = os.path.expanduser(getattr(myconfig, 'ssh_config_file', '~/.ssh/config'))
+            conn = await asyncssh.connect(
+                workstation,
+                config=[config_file] if os.path.exists(config_file) else (),
+                connect_timeout=myconfig.ssh_timeout)
+            _async_conns[workstation] = conn
+        result = await conn.run(cmd_str, input=stdin, timeout=timeout)
+    except asyncssh.TimeoutError as e:
+        # The connection is fine; keep what the command printed in time
+        out = e.stdout or ''
+        return {'OK': False, 'code': 255,
+                'stdout': out[:-1] if out.endswith('\n') else out,
+                'stderr': e.stderr or str(e)}
     except Exception as e:
-        logger.error(f"{workstation}: SSH command failed: {str(e)}")
-        return False, [], str(e)
+        # Drop the connection so the next command reconnects
+        conn = _async_conns.pop(workstation, None)
+        if conn is not None:
+            conn.close()
+        return {'OK': False, 'code': 255, 'stdout': '', 'stderr': str(e)}
+    
+    code = result.exit_status if result.exit_status is not None else 255
+    out, err = result.stdout or '', result.stderr or ''
+    return {'OK': code == 0,
+            'code': code,
+            'stdout': out[:-1] if out.endswith('\n') else out,
+            'stderr': err[:-1] if err.endswith('\n') else err}
+
+async def _async_close_all() -> None:
+    for conn in _async_conns.values():
+        conn.close()
+        await conn.wait_closed()
+    _async_conns.clear()
+
+def _stop_ssh_master(workstation: str) -> None:
+    """
+    Ask workstation's ControlMaster process, if ssh_options configures
+    one, to exit; the next ssh to it starts a fresh master.
+    """
+    if any('ControlMaster' in opt for opt in myconfig.ssh_options):
+        dorunrun([*myconfig._ssh_prefix, '-O', 'exit', *_ssh_target(workstation)],
+                 timeout=5, close_fds=False)
+
+def close_ssh_pool() -> None:
+    """
+    Close any pooled paramiko sessions and asyncssh connections, and stop
+    the ControlMaster processes of workstations reached with ssh rather
+    than leaving them to linger for ControlPersist.
+    """
+    global _async_loop, _ssh_pool, _ssh_masters
     
-    # Check result
-    if result['code'] != 0:
-        error_msg = result.get('stderr', '') or f"Exit code {result['code']}"
-        
-        # Special handling for "Protocol not supported" - this is expected for HIV_flaps
-        if 'Protocol not supported' in error_msg:
-            # Log it as info, not error
-            logger.info(f"{workstation}: Expected HIV_flaps nested mount message: {error_msg[:100]}")
-            # Don't treat this as a failure - continue processing
-        else:
-            logger.error(f"Failed to get mount status from {workstation}: {error_msg}")
-            return False, [], error_msg
+    # Swap in empty containers and work on the snapshots
+    with _ssh_pool_lock:
+        clients, _ssh_pool = list(_ssh_pool.values()), {}
+        masters, _ssh_masters = list(_ssh_masters), set()
     
-    # Parse successful output (or output with expected Protocol errors)
-    stdout = result.get('stdout', '')
-    stderr = result.get('stderr', '')
+    for client in clients:
+        client.close()
     
-    # Only log stderr if it's NOT the expected Protocol not supported error
-    if stderr and 'Protocol not supported' not in stderr:
-        logger.info(f"{workstation}: mount -av stderr: {stderr}")
+    for workstation in masters:
+        _stop_ssh_master(workstation)
     
-    logger.debug(f"{workstation}: mount -av stdout lines: {len(stdout.splitlines())}")
+    if _async_loop is not None:
+        _async_run(_async_close_all())
+        _async_loop.call_soon_threadsafe(_async_loop.stop)
+        _async_loop = None
 
-    # Parse mount output
-    mounts = []
-    for line in stdout.splitlines():
-        if not line.strip():
-            continue
-        
-        # Look for mount status lines: "mount_point : status"
-        if ' : ' in line:
-            try:
-                mount_point, status_msg = line.split(' : ', 1)
-                mount_point = mount_point.strip()
-                status_msg = status_msg.strip()
-                
-                # Determine mount status
-                if 'already mounted' in status_msg.lower():
-                    status = 'mounted'
-                elif 'successfully mounted' in status_msg.lower():
-                    status = 'newly_mounted'
-                elif 'ignored' in status_msg.lower():
-                    continue
-                else:
-                    status = 'unknown'
-                
-                # Try to extract device info
-                device = ''
-                if ' on ' in line:
-                    device = line.split(' on ')[0].strip()
-                
-                mounts.append({
-                    'device': device,
-                    'mount_point': mount_point,
-                    'status': status
-                })
-                
-            except ValueError:
-                logger.debug(f"Could not parse mount line: {line}")
-                continue
-    
-    # If we got Protocol not supported but have mounts, return success
-    if 'Protocol not supported' in stderr and mounts:
-        return True, mounts, ""  # Empty error message since it's not a real error
-    
-    return True, mounts, ""
+def run_remote(workstation: str, cmd_str: str, timeout: int = None,
+               stdin: str = None) -> Dict:
+    """
+    Run cmd_str on workstation and return a dorunrun-style dict
+    ({'OK', 'code', 'stdout', 'stderr'}, trailing newline stripped).
+    stdin, if given, is fed to the remote command's standard input.
+    On timeout, code is 255 and stdout holds what arrived before it.
+    
+    With ssh_backend = 'paramiko' or 'asyncssh' (and that package
+    installed) the command runs over a pooled, already-authenticated
+    session; otherwise it execs ssh.
+    """
+    backend = getattr(myconfig, 'ssh_backend', 'ssh')
+    if have_asyncssh and backend == 'asyncssh':
+        return _async_run(_async_command(workstation, cmd_str, timeout, stdin))
+    if not (have_paramiko and backend == 'paramiko'):
+        with _ssh_pool_lock:
+            _ssh_masters.add(workstation)
+        # Nothing of ours is inheritable, so skip closing descriptors
+        # and let subprocess use posix_spawn instead of fork
+        result = dorunrun(ssh_command(workstation, cmd_str), timeout=timeout,
+                          close_fds=False, input=stdin or "")
+        # 255 is ssh's own failure (or our timeout): the master may be
+        # stale, so drop it rather than reuse it for the next command
+        if result['code'] == 255:
+            _stop_ssh_master(workstation)
+        return result
+    
+    # stdout is read a chunk at a time so a timeout keeps what came before it
+    chunks = []
+    try:
+        client = _get_client(workstation)
+        stdin_file, stdout, stderr = client.exec_command(cmd_str, timeout=timeout)
+        if stdin:
+            stdin_file.write(stdin)
+        stdin_file.channel.shutdown_write()
+        while chunk := stdout.channel.recv(65536):
+            chunks.append(chunk)
+        out = b''.join(chunks).decode(errors='replace')
+        err = stderr.read().decode(errors='replace')
+        code = stdout.channel.recv_exit_status()
+    except Exception as e:
+        # Drop the session so the next command reconnects
+        with _ssh_pool_lock:
+            client = _ssh_pool.pop(workstation, None)
+        if client is not None:
+            client.close()
+        out = b''.join(chunks).decode(errors='replace')
+        return {'OK': False, 'code': 255,
+                'stdout': out[:-1] if out.endswith('\n') else out,
+                'stderr': str(e)}
+    
+    return {'OK': code == 0,
+            'code': code,
+            'stdout': out[:-1] if out.endswith('\n') else out,
+            'stderr': err[:-1] if err.endswith('\n') else err}
 
-@trap
-def check_mount_point_directories(workstation: str, expected_mounts: List[str]) -> Dict[str, str]:
+def is_host_online(ctx: MonitorCtx, hostname: str) -> bool:
     """
-    Check if mount point directories exist on the workstation.
+    Check if a host is reachable by connecting to its SSH port. This is
+    what every later check needs anyway, and unlike ping it costs neither
+    a fork nor two seconds per silent host.
+    
+    With online_check = 'ping' the old ICMP check is used instead, for
+    networks where the SSH port is filtered from the monitoring host.
     """
-    global myconfig
-    results = {}
+    cfg, logger = ctx.cfg, ctx.logger
     
-    if not expected_mounts:
-        return results
+    port = getattr(cfg, 'ssh_port', DEFAULT_SSH_PORT)
+    timeout = getattr(cfg, 'online_timeout', DEFAULT_ONLINE_TIMEOUT)
+    if getattr(cfg, 'online_check', 'tcp') == 'ping':
+        result = dorunrun(['ping', '-c', '2', '-W', str(timeout), resolve(hostname)],
+                          timeout=2 * timeout + 1)
+        return result['code'] == 0
+    
+    try:
+        with socket.create_connection((resolve(hostname), port), timeout=timeout):
+            return True
+    except OSError as e:
+        logger.debug(f"{hostname}: port {port} unreachable: {e}")
+        return False
+
+def hosts_online(ctx: MonitorCtx, hostnames: List[str]) -> Dict[str, bool]:
+    """
+    is_host_online() for many hosts at once: start a non-blocking connect
+    to every host's SSH port and wait on all of them together, so the
+    whole batch costs at most one online_timeout.
     
-    # Build command to check all mount points
-    checks = ' && '.join([f'test -d "{mp}" && echo "{mp}:exists" || echo "{mp}:missing"' 
-                          for mp in expected_mounts])
+    Hosts whose name does not resolve are reported offline.
+    """
+    cfg, logger = ctx.cfg, ctx.logger
     
-    cmd = ['ssh'] + myconfig.ssh_options + [workstation, f'bash -c \'{checks}\'']
+    port = getattr(cfg, 'ssh_port', DEFAULT_SSH_PORT)
+    timeout = getattr(cfg, 'online_timeout', DEFAULT_ONLINE_TIMEOUT)
+    online = {hostname: False for hostname in hostnames}
     
-    try:
-        result = dorunrun(cmd, timeout=myconfig.ssh_timeout)
+    with selectors.DefaultSelector() as sel:
+        for hostname in online:
+            address = resolve(hostname)
+            try:
+                family = (socket.AF_INET6 if ipaddress.ip_address(address).version == 6
+                          else socket.AF_INET)
+            except ValueError:
+                # resolve() hands back the name itself when lookup fails
+                continue
+            
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.setblocking(False)
+            rc = sock.connect_ex((address, port))
+            if rc == 0:
+                online[hostname] = True
+                sock.close()
+            elif rc in (errno.EINPROGRESS, errno.EWOULDBLOCK):
+                sel.register(sock, selectors.EVENT_WRITE, hostname)
+            else:
+                sock.close()
         
-        if result['code'] == 0:
-            for line in result['stdout'].splitlines():
-                if ':' in line:
-                    mp, status = line.rsplit(':', 1)
-                    results[mp] = status
-        else:
-            for mp in expected_mounts:
-                results[mp] = 'error'
-                
-    except Exception as e:
-        logger.error(f"Failed to check mount directories on {workstation}: {e}")
-        for mp in expected_mounts:
-            results[mp] = 'error'
+        deadline = time.monotonic() + timeout
+        while sel.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            for key, _ in sel.select(remaining):
+                sock = key.fileobj
+                online[key.data] = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR) == 0
+                sel.unregister(sock)
+                sock.close()
+        
+        for key in list(sel.get_map().values()):
+            sel.unregister(key.fileobj)
+            key.fileobj.close()
+    
+    for hostname, is_up in online.items():
+        if not is_up:
+            logger.debug(f"{hostname}: port {port} unreachable")
+    return online
+
+# "mount_point : status" lines of 'mount -av', split at the first ' : '
+MOUNT_LINE_RE = re.compile(r'^(.*?) : (.*)$', re.MULTILINE)
+MOUNT_STATUS_RE = re.compile(r'already mounted|successfully mounted|ignored',
+                             re.IGNORECASE)
+MOUNT_STATUS_MAP = {
+    'already mounted': 'mounted',
+    'successfully mounted': 'newly_mounted',
+    'ignored': None
+}
+
+def parse_mount_output(stdout: str) -> List[Dict]:
+    """
+    Parse 'mount -av' output into a list of
+    {'device', 'mount_point', 'status'} dicts. Ignored entries are dropped.
+    """
+    mounts = []
+    for match in MOUNT_LINE_RE.finditer(stdout):
+        # Determine mount status; only the matched keyword is lowercased
+        found = MOUNT_STATUS_RE.search(stdout, match.start(2), match.end(2))
+        status = MOUNT_STATUS_MAP[found.group(0).lower()] if found else 'unknown'
+        if status is None:
+            continue
+        
+        # Try to extract device info
+        device, on, _ = match.group(0).partition(' on ')
+        device = device.strip() if on else ''
+        
+        mounts.append({
+            'device': device,
+            'mount_point': match.group(1).strip(),
+            'status': status
+        })
     
-    return results
+    return mounts
 
-@trap
-def verify_software_access(workstation: str, mount_point: str, software_list: List[str]) -> Dict[str, bool]:
+# Fed to 'bash -s' with the paths as its positional arguments, so a path
+# is never spliced into shell code. A test that outlives {timeout} seconds
+# is killed and its path reported missing
+SOFTWARE_CHECK_SCRIPT = ('for p in "$@"; do '
+                         'if timeout -s KILL {timeout} test -e "$p"; '
+                         'then echo "$p:1"; else echo "$p:0"; fi; '
+                         'done\n')
+
+def _path_args_command(paths: Iterable[str]) -> str:
+    """The 'bash -s -- path ...' command line that runs a *_CHECK_SCRIPT."""
+    return ' '.join(['bash', '-s', '--'] + [shlex.quote(p) for p in paths])
+
+def verify_software_access(ctx: MonitorCtx, workstation: str, mount_point: str,
+                           software_list: List[str], cycle_ts: str = None) -> Dict[str, bool]:
     """
-    Verify that critical software is accessible on a mount point.
+    Verify that critical software is accessible on a mount point, testing
+    every package in one SSH session, and record each result.
     """
-    global myconfig
-    global db
+    cfg, logger, db = ctx.cfg, ctx.logger, ctx.db
     
     results = {}
     
     if not software_list:
         return results
     
-    for software in software_list:
-        software_path = f"{mount_point}/{software}"
-        cmd = ['ssh'] + myconfig.ssh_options + [
-            workstation, f'test -e "{software_path}" && echo "1" || echo "0"'
-        ]
-        
-        try:
-            result = dorunrun(cmd, timeout=10)
-            accessible = '1' in result['stdout']
-            results[software] = accessible
-            
-            # Log to database (using mount_point instead of software_path)
-            db.record_software_check(workstation, software, mount_point, accessible)
-            
-        except Exception as e:
-            logger.error(f"Failed to check {software} on {workstation}: {e}")
-            results[software] = False
-            db.record_software_check(workstation, software, mount_point, False)
+    paths = {f"{mount_point}/{software}": software for software in software_list}
+    path_timeout = int(getattr(cfg, 'path_timeout', DEFAULT_PATH_TIMEOUT))
+    found = {}
+    started = time.monotonic()
+    try:
+        result = run_remote(workstation, _path_args_command(paths),
+                            timeout=cfg.ssh_timeout,
+                            stdin=SOFTWARE_CHECK_SCRIPT.format(timeout=path_timeout))
+        for line in result['stdout'].splitlines():
+            if ':' in line:
+                path, flag = line.rsplit(':', 1)
+                found[path] = flag == '1'
+    except Exception as e:
+        logger.error(f"Failed to check software on {workstation}: {e}")
+    
+    # One session checks every package, so each shares its time
+    elapsed_ms = (time.monotonic() - started) * 1000
+    
+    for path, software in paths.items():
+        accessible = found.get(path, False)
+        results[software] = accessible
+        # Log to database (using mount_point instead of software_path)
+        db.record_software_check(workstation, software, mount_point, accessible,
+                                 timestamp=cycle_ts, check_time_ms=elapsed_ms)
     
     return results
 
-@trap
-def attempt_remount(workstation: str, mount_point: str = None) -> bool:
+def attempt_remount_and_verify(ctx: MonitorCtx, workstation: str,
+                               mount_point: str = None,
+                               verify: List[str] = None) -> Tuple[bool, List[str], str]:
     """
-    Attempt to remount filesystem(s) on workstation.
+    Attempt to remount filesystem(s) on workstation, and check the mount
+    points in verify (default: mount_point) with 'mountpoint -q' in the
+    same SSH session, so no second round trip is needed to see the result.
+    
+    Returns:
+        Tuple of (fix_success, remounted, error_message). remounted lists
+        the verify paths that are mount points after the remount; it is
+        empty if that output could not be collected.
     """
-    global myconfig
+    logger = ctx.logger
     
     if mount_point:
         logger.info(f"Attempting to remount {mount_point} on {workstation}")
-        cmd_str = f'sudo mount {mount_point}'
+        cmd_str = f'sudo mount {shlex.quote(mount_point)}'
     else:
         logger.info(f"Attempting to remount all on {workstation}")
         cmd_str = 'sudo mount -a'
     
-    cmd = ['ssh'] + myconfig.ssh_options + [workstation, cmd_str]
+    if verify is None:
+        verify = [mount_point] if mount_point else []
+    checks = ''.join(f'; mountpoint -q {q} && echo {q}'
+                     for q in map(shlex.quote, verify))
     
+    # Keep the remount's exit code as the session's exit code
+    cmd_str = f'{cmd_str}; rc=$?; echo {REMOUNT_MARKER}{checks}; exit $rc'
     try:
-        result = dorunrun(cmd, timeout=60)
-        
-        if result['code'] == 0:
-            logger.info(f"Successfully remounted on {workstation}")
-            return True
-        else:
-            logger.error(f"Failed to remount on {workstation}: {result.get('stderr', '')}")
-            return False
-            
+        result = run_remote(workstation, cmd_str, timeout=60)
     except Exception as e:
         logger.error(f"Failed to remount on {workstation}: {e}")
-        return False
+        return False, [], str(e)
+    
+    stdout = result.get('stdout', '')
+    remounted = []
+    if REMOUNT_MARKER in stdout:
+        remounted = [line for line in stdout.split(REMOUNT_MARKER, 1)[1].splitlines()
+                     if line in verify]
+    
+    if result['code'] == 0:
+        logger.info(f"Successfully remounted on {workstation}")
+        return True, remounted, ""
+    
+    error_msg = result.get('stderr', '')
+    logger.error(f"Failed to remount on {workstation}: {error_msg}")
+    return False, remounted, error_msg
 
-@trap
-def count_active_users(workstation: str) -> Tuple[int, Optional[str]]:
+def _split_sections(stdout: str) -> Dict[str, str]:
     """
-    Count number of active users on workstation.
+    Split combined probe output into {section_name: text} at the
+    PROBE_MARKER headers, slicing between header positions rather than
+    splitting the whole output into lines. Text before the first header
+    is dropped.
     """
-    global myconfig
-    
-    cmd = ['ssh'] + myconfig.ssh_options + [workstation, 'who | cut -d" " -f1 | sort -u']
+    sections = {}
+    name = start = None
+    for match in PROBE_MARKER_RE.finditer(stdout):
+        if name is not None:
+            sections[name] = stdout[start:match.start()]
+        name, start = match.group(1), match.end()
+    if name is not None:
+        sections[name] = stdout[start:]
+    return sections
+
+@dataclasses.dataclass
+class WorkstationState:
+    """
+    What gather_workstation_state() found on a workstation.
+    
+        success: False if the probe (or 'mount -av') failed
+        error: error message when success is False
+        users: number of distinct logged-in users
+        user_list: comma-separated distinct logins, or None if none
+        mounts: parsed 'mount -av' entries (see parse_mount_output)
+        dirs: {mount_point: 'exists' | 'missing'}
+        software: {'mount/software': bool}
+    """
+    success: bool = False
+    error: str = ''
+    users: int = 0
+    user_list: Optional[str] = None
+    mounts: List[Dict] = dataclasses.field(default_factory=list)
+    dirs: Dict[str, str] = dataclasses.field(default_factory=dict)
+    software: Dict[str, bool] = dataclasses.field(default_factory=dict)
+
+def gather_workstation_state(ctx: MonitorCtx, workstation: str,
+                             expected_mounts: List[str],
+                             software_plan: List[Tuple[str, List[str]]],
+                             track_users: bool = True) -> WorkstationState:
+    """
+    Collect everything monitor_workstation() needs from a workstation in a
+    single SSH invocation: logged-in users, 'mount -av' (stdout, stderr and
+    exit code kept apart), mount point directory existence, and critical
+    software paths.
+    
+    The script is fed to 'bash -s' on stdin rather than passed as the ssh
+    command line, so it does not depend on the remote login shell. The
+    paths it tests are its positional arguments (the number of mount
+    points first), so no path is spliced into shell code. Each path test
+    is killed after path_timeout seconds, and if the session itself times
+    out, the sections it had already printed are still used.
+    """
+    logger = ctx.logger
+    
+    marker = PROBE_MARKER.format
+    path_timeout = int(getattr(ctx.cfg, 'path_timeout', DEFAULT_PATH_TIMEOUT))
+    software_paths = [f"{mp}/{sw}" for mp, sw_list in software_plan for sw in sw_list]
+    
+    script = []
+    if track_users:
+        script.append(f"echo {marker('USERS')}; {USERS_COMMAND}")
+    # mount's stdout goes straight out; its stderr is captured separately
+    script.append(f"echo {marker('MOUNTS')}; exec 3>&1; "
+                  f"err=$(mount -av 2>&1 1>&3); rc=$?; exec 3>&-; "
+                  f"echo {marker('MOUNT_ERR')}; printf '%s\\n' \"$err\"; "
+                  f"echo {marker('MOUNT_RC')}; echo $rc")
+    script.append(f"echo {marker('DIRS')}; n=$1; shift")
+    # Each test gets its own time limit, so one hung path cannot hold up
+    # the rest of the probe
+    script.append('for p in "${@:1:n}"; do '
+                  f'if timeout -s KILL {path_timeout} test -d "$p"; '
+                  'then echo "$p:exists"; else echo "$p:missing"; fi; done')
+    script.append(f"echo {marker('SW')}")
+    script.append('for p in "${@:n+1}"; do '
+                  f'if timeout -s KILL {path_timeout} test -e "$p"; '
+                  'then echo "$p:1"; else echo "$p:0"; fi; done')
+    
+    # bash parses the whole { } group before running it, so nothing in it
+    # can read the rest of the script from stdin
+    script = '{\n' + '\n'.join(script) + '\n} </dev/null\n'
+    
+    state = WorkstationState()
     
     try:
-        result = dorunrun(cmd, timeout=10)
-        if result['code'] == 0 and result['stdout'].strip():
-            users = result['stdout'].strip().split('\n')
-            user_count = len(users)
-            user_list = ','.join(users)
-            return user_count, user_list
+        result = run_remote(workstation,
+                            _path_args_command([str(len(expected_mounts)),
+                                                *expected_mounts, *software_paths]),
+                            timeout=ctx.cfg.ssh_timeout, stdin=script)
     except Exception as e:
-        logger.debug(f"Could not count users on {workstation}: {e}")
+        logger.error(f"{workstation}: SSH command failed: {str(e)}")
+        state.error = str(e)
+        return state
+    
+    sections = _split_sections(result.get('stdout', ''))
+    
+    users = [u for u in sections.get('USERS', '').splitlines() if u.strip()]
+    state.users = len(users)
+    state.user_list = ','.join(users) if users else None
+    
+    if 'MOUNT_RC' not in sections:
+        # The remote script never ran to completion; treat as an SSH failure
+        state.error = result.get('stderr', '') or f"Exit code {result['code']}"
+        logger.error(f"Failed to get mount status from {workstation}: {state.error}")
+        return state
+    
+    for line in sections.get('DIRS', '').splitlines():
+        if ':' in line:
+            mp, status = line.rsplit(':', 1)
+            state.dirs[mp] = status
+    
+    for line in sections.get('SW', '').splitlines():
+        if ':' in line:
+            path, flag = line.rsplit(':', 1)
+            state.software[path] = flag == '1'
+    
+    # 'Protocol not supported' is the expected HIV_flaps nested mount
+    # message, not a failure
+    mount_rc = int(sections['MOUNT_RC'].strip() or 0)
+    stderr = sections.get('MOUNT_ERR', '').strip()
+    if mount_rc != 0:
+        error_msg = stderr or f"Exit code {mount_rc}"
+        if 'Protocol not supported' in error_msg:
+            logger.info(f"{workstation}: Expected HIV_flaps nested mount message: {error_msg[:100]}")
+        else:
+            logger.error(f"Failed to get mount status from {workstation}: {error_msg}")
+            state.error = error_msg
+            return state
     
-    return 0, None
+    if stderr and 'Protocol not supported' not in stderr:
+        logger.info(f"{workstation}: mount -av stderr: {stderr}")
+    
+    mount_output = sections.get('MOUNTS', '')
+    line_count = mount_output.count('\n')
+    logger.debug(f"{workstation}: mount -av stdout lines: {line_count}")
+    state.mounts = parse_mount_output(mount_output)
+    state.success = True
+    return state
 
 @trap
-def monitor_workstation(workstation_config: Dict) -> Dict:
+def monitor_workstation(ctx: MonitorCtx, workstation_config: Workstation,
+                        cycle_ts: str = None, online: bool = None) -> Dict:
     """
     Monitor a single workstation's NAS mounts and verify software accessibility.
     
     Args:
-        workstation_config: Dictionary with 'host' and 'mounts' keys
-                           Example: {'host': 'adam', 'mounts': ['/usr/local/chem.sw']}
+        ctx: Configuration, logger and database for this run
+        workstation_config: Workstation to check
+                           Example: Workstation('adam', ['/usr/local/chem.sw'])
+        cycle_ts: Timestamp shared by every row written in this cycle
+                  (UTC, 'YYYY-MM-DD HH:MM:SS'); defaults to now
+        online: Reachability already found by hosts_online(); checked
+                here with is_host_online() if None
     
     Returns:
         Dictionary containing monitoring results
     """
-    global myconfig
-    global db
-    global logger
+    cfg, logger, db = ctx.cfg, ctx.logger, ctx.db
+    
+    workstation = workstation_config.host
+    expected_mounts = workstation_config.mounts
+    
+    # Bind hot config values once for the body of this function
+    track_users = cfg.track_users
+    attempt_fix = cfg.attempt_fix
+    crit_sw = cfg._sw_plan.get(workstation, [])
     
-    workstation = workstation_config['host']
-    expected_mounts = workstation_config['mounts']
+    if cycle_ts is None:
+        cycle_ts = cycle_timestamp()
     
     report = {
         'workstation': workstation,
-        'timestamp': datetime.datetime.now().isoformat(),
+        'timestamp': cycle_ts,
         'online': None,
         'mounts': {},
         'software': {},
@@ -331,10 +920,11 @@ def monitor_workstation(workstation_config: Dict) -> Dict:
     }
     
     logger.info(f"Checking workstation: {workstation}")
-    mynetid = os.environ.get('USER', 'unknown')
     
     # Check if host is online
-    if not is_host_online(workstation):
+    if online is None:
+        online = is_host_online(ctx, workstation)
+    if not online:
         report['online'] = False
         logger.warning(f"{workstation} is offline")
         db.update_workstation_status(workstation, is_online=False, active_users=0,
@@ -343,15 +933,34 @@ def monitor_workstation(workstation_config: Dict) -> Dict:
     
     report['online'] = True
     
+    # Nothing to verify (software is only checked on expected mounts), so
+    # only the logged-in users are asked for
+    if not expected_mounts:
+        logger.info(f"{workstation}: no mounts configured - skipping mount checks")
+        user_list = None
+        if track_users:
+            try:
+                result = run_remote(workstation, USERS_COMMAND, timeout=cfg.ssh_timeout)
+                users = [u for u in result['stdout'].splitlines() if u.strip()]
+                report['users'] = len(users)
+                user_list = ','.join(users) if users else None
+            except Exception as e:
+                logger.error(f"{workstation}: SSH command failed: {str(e)}")
+        db.update_workstation_status(workstation, is_online=True,
+                                    active_users=report['users'],
+                                    user_list=user_list, checked_by=mynetid)
+        return report
+    
+    # One SSH round trip for users, mounts, mount point dirs and software
+    state = gather_workstation_state(ctx, workstation, expected_mounts, crit_sw, track_users)
+    
     # Count active users if configured
-    if myconfig.track_users:
-        user_count, user_list = count_active_users(workstation)
-        report['users'] = user_count
-        if user_count > 0:
-            logger.info(f"{workstation} has {user_count} active users: {user_list}")
+    if track_users:
+        report['users'] = state.users
+        if state.users > 0:
+            logger.info(f"{workstation} has {state.users} active users: {state.user_list}")
     
-    # Get mount status
-    success, mount_list, error_msg = get_mount_status(workstation)
+    success, mount_list, error_msg = state.success, state.mounts, state.error
     
     if not success:
         # Classify the error
@@ -374,104 +983,195 @@ def monitor_workstation(workstation_config: Dict) -> Dict:
         
         db.update_workstation_status(workstation, is_online=True, 
                                     active_users=report['users'],
-                                    user_list=None, checked_by=mynetid)
+                                    user_list=state.user_list, checked_by=mynetid)
         
-        # Don't attempt fixes if it's just a connectivity issue or info
-        if issue_type == 'connectivity' or severity == 'info':
-            logger.info(f"Skipping mount attempts for {workstation}")
-            return report
+        # Without the probe's output there is nothing to fix or verify;
+        # checking software would only report every package as missing
+        logger.info(f"Skipping mount and software checks for {workstation}")
+        return report
     else:
         # Process mount results
         mounted_points = {m['mount_point']: m for m in mount_list}
+        missing = set(expected_mounts) - mounted_points.keys()
+        
+        # HIV_flaps is a nested mount, accessible whenever its parent is
+        nested = set()
+        if '/franksinatra/logP' in mounted_points:
+            nested = {'/franksinatra/HIV_flaps'} & set(expected_mounts)
+            missing -= nested
+        
+        # One 'mount -a' covers every missing mount point, and the same
+        # session reports which of them came back. Its exit code is not
+        # consulted: one unrelated fstab entry failing makes it nonzero
+        remounted = set()
+        if missing and attempt_fix and report['users'] == 0:
+            logger.info(f"Attempting to fix mounts on {workstation}")
+            _, back, _ = attempt_remount_and_verify(ctx, workstation, verify=sorted(missing))
+            remounted = set(back)
+        elif missing and report['users'] > 0:
+            logger.info(f"Skipping auto-fix on {workstation} - users active")
         
         for mount_point in expected_mounts:
-            # Skip checking HIV_flaps since it's a special nested mount
-            if mount_point == '/franksinatra/HIV_flaps':
-                # Check if parent is mounted
-                if '/franksinatra/logP' in mounted_points:
-                    report['mounts'][mount_point] = 'nested_mount'
-                    logger.info(f"{workstation}: {mount_point} accessible via parent mount")
-                    continue
+            if mount_point in nested:
+                report['mounts'][mount_point] = 'nested_mount'
+                logger.info(f"{workstation}: {mount_point} accessible via parent mount")
+                continue
             
-            if mount_point in mounted_points:
+            if mount_point not in missing:
                 report['mounts'][mount_point] = 'mounted'
                 db.record_mount_status(workstation, mount_point, 
                                      mounted_points[mount_point].get('device', ''),
-                                     'nfs', 'mounted')
+                                     'nfs', 'mounted', timestamp=cycle_ts)
+                continue
+            
+            # This is a real mount failure
+            if state.dirs.get(mount_point) == 'missing':
+                status = 'directory_missing'
+                description = f"Mount point directory {mount_point} does not exist"
             else:
-                # This is a real mount failure
-                report['mounts'][mount_point] = 'not_mounted'
+                status = 'not_mounted'
+                description = f"Mount point {mount_point} is not mounted"
+            
+            report['mounts'][mount_point] = status
+            report['issues'].append({
+                'type': 'mount_failure',
+                'severity': 'critical',
+                'mount_point': mount_point,
+                'description': description
+            })
+            
+            db.record_mount_status(workstation, mount_point, '', 'nfs', status,
+                                 timestamp=cycle_ts)
+            
+            if mount_point in remounted:
+                report['mounts'][mount_point] = 'remounted'
+                db.record_mount_status(workstation, mount_point, '',
+                                     'nfs', 'newly_mounted',
+                                     action_taken='Auto-remounted',
+                                     timestamp=cycle_ts)
+    
+    # Record critical software results (plan only holds expected mounts).
+    # Software on a mount that is still down is covered by its mount_failure
+    for mount_point, software_list in crit_sw:
+        if report['mounts'].get(mount_point) in ('not_mounted', 'directory_missing'):
+            logger.debug(f"{workstation}: {mount_point} not mounted - skipping software checks")
+            continue
+        if report['mounts'].get(mount_point) == 'remounted':
+            # The batched probe ran before the remount; look again
+            software_status = verify_software_access(
+                ctx, workstation, mount_point, software_list, cycle_ts
+            )
+        else:
+            software_status = {}
+            for software in software_list:
+                software_status[software] = state.software.get(
+                    f"{mount_point}/{software}", False)
+                db.record_software_check(workstation, software, mount_point,
+                                         software_status[software], timestamp=cycle_ts)
+        
+        for software, accessible in software_status.items():
+            report['software'][software] = accessible
+            if not accessible:
                 report['issues'].append({
-                    'type': 'mount_failure',
-                    'severity': 'critical',
+                    'type': 'software_missing',
+                    'severity': 'warning',
+                    'software': software,
                     'mount_point': mount_point,
-                    'description': f"Mount point {mount_point} is not mounted"
+                    'description': f"Software {software} not accessible on {mount_point}"
                 })
-                
-                db.record_mount_status(workstation, mount_point, '', 'nfs', 'not_mounted')
-                
-                # Attempt to fix if configured and no users
-                if myconfig.attempt_fix and report['users'] == 0:
-                    logger.info(f"Attempting to fix mounts on {workstation}")
-                    if attempt_remount(workstation):
-                        # Re-check this specific mount
-                        success2, mounts2, _ = get_mount_status(workstation)
-                        if success2:
-                            mounted2 = {m['mount_point']: m for m in mounts2}
-                            if mount_point in mounted2:
-                                report['mounts'][mount_point] = 'remounted'
-                                db.record_mount_status(workstation, mount_point,
-                                                     mounted2[mount_point].get('device', ''),
-                                                     'nfs', 'newly_mounted',
-                                                     action_taken='Auto-remounted')
-                elif report['users'] > 0:
-                    logger.info(f"Skipping auto-fix on {workstation} - users active")
-    
-    # Check critical software if mounts are OK
-    for sw_config in myconfig.critical_software:
-        mount_point = sw_config['mount']
-        software_list = sw_config['software']
-        
-        # Only check if this mount is expected on this workstation
-        if mount_point in expected_mounts:
-            software_status = verify_software_access(
-                workstation, mount_point, software_list
-            )
-            for software, accessible in software_status.items():
-                report['software'][software] = accessible
-                if not accessible:
-                    report['issues'].append({
-                        'type': 'software_missing',
-                        'severity': 'warning',
-                        'software': software,
-                        'mount_point': mount_point,
-                        'description': f"Software {software} not accessible on {mount_point}"
-                    })
     
     # Update database
     db.update_workstation_status(
         workstation,
         is_online=True,
         active_users=report['users'],
-        user_list=None,
+        user_list=state.user_list,
         checked_by=mynetid
     )
     
     return report
 
+def pool_size(config: types.SimpleNamespace, count: int) -> int:
+    """
+    Worker threads for checking count workstations: max_parallel (or
+    DEFAULT_MAX_PARALLEL if unset or 0), but never more than count and
+    never fewer than one.
+    """
+    max_parallel = getattr(config, 'max_parallel', None) or DEFAULT_MAX_PARALLEL
+    return max(1, min(count, max_parallel))
+
 @trap
-def monitor_all_workstations(workstation_configs: List[Dict]) -> List[Dict]:
+def monitor_all_workstations(ctx: MonitorCtx, workstation_configs: Sequence[Workstation],
+                             executor: concurrent.futures.Executor = None) -> List[Dict]:
     """
     Monitor all configured workstations.
+    
+    Reachability of every workstation is checked in one batch first. Each
+    workstation is then I/O bound on SSH, so they are checked concurrently
+    on executor (a pool of pool_size() threads for this call if not given).
+    Results are returned in configuration order.
+    
+    Workstations whose check has not finished cycle_deadline seconds after
+    the cycle started are reported with a connectivity issue instead, so
+    one hung host cannot hold up the whole cycle.
     """
-    global db
-    global logger
+    cfg, logger, db = ctx.cfg, ctx.logger, ctx.db
     
-    results = []
+    cycle_ts = cycle_timestamp()
+    if getattr(cfg, 'online_check', 'tcp') == 'ping':
+        # Each worker pings its own host; None makes monitor_workstation() check
+        online = {ws_config.host: None for ws_config in workstation_configs}
+    else:
+        online = hosts_online(ctx, [ws_config.host for ws_config in workstation_configs])
     
-    for ws_config in workstation_configs:
-        result = monitor_workstation(ws_config)
-        results.append(result)
+    own_executor = executor is None
+    if own_executor:
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=pool_size(cfg, len(workstation_configs)))
+    
+    try:
+        # The cycle's rows are committed together when the batch (or the
+        # caller's enclosing one) closes
+        with db.batch():
+            futures = {executor.submit(monitor_workstation, ctx, ws_config, cycle_ts,
+                                       online[ws_config.host]): i
+                       for i, ws_config in enumerate(workstation_configs)}
+            
+            results = [None] * len(futures)
+            deadline = getattr(cfg, 'cycle_deadline', DEFAULT_CYCLE_DEADLINE)
+            try:
+                for future in concurrent.futures.as_completed(futures, timeout=deadline):
+                    result = future.result()
+                    results[futures[future]] = result
+                    logger.debug(f"{result['workstation']}: check complete")
+            except concurrent.futures.TimeoutError:
+                for future, i in futures.items():
+                    if future.done():
+                        results[i] = future.result()
+                        continue
+                    
+                    # A running check can't be stopped; its late rows still
+                    # reach the database, but this cycle reports it as hung
+                    future.cancel()
+                    workstation = workstation_configs[i].host
+                    logger.warning(f"{workstation}: check did not finish within {deadline}s")
+                    results[i] = {
+                        'workstation': workstation,
+                        'timestamp': cycle_ts,
+                        'online': online[workstation] is not False,
+                        'mounts': {},
+                        'software': {},
+                        'issues': [{
+                            'type': 'connectivity',
+                            'severity': 'warning',
+                            'description': f"Check did not finish within {deadline}s"
+                        }],
+                        'users': 0
+                    }
+    finally:
+        if own_executor:
+            # Don't wait on checks abandoned at the deadline
+            executor.shutdown(wait=False)
     
     # Cleanup old records using database triggers
     mount_deleted, software_deleted, failures_deleted = db.cleanup_old_records()
@@ -479,6 +1179,10 @@ def monitor_all_workstations(workstation_configs: List[Dict]) -> List[Dict]:
     
     return results
 
+# Index of an issue type's list in generate_summary_report(); anything
+# else is reported under other issues
+ISSUE_BUCKET = {'mount_failure': 0, 'connectivity': 1}
+
 @trap
 def generate_summary_report(results: List[Dict]) -> str:
     """
@@ -487,103 +1191,82 @@ def generate_summary_report(results: List[Dict]) -> str:
     Filters out info-level issues (like HIV_flaps configuration messages).
     """
     total = len(results)
-    online = sum(1 for r in results if r['online'])
-    offline = sum(1 for r in results if not r['online'])
+    online = 0
     
-    # Classify issues (excluding info-level)
-    mount_failures = []
-    connectivity_issues = []
-    other_issues = []
+    # Count online hosts and classify issues (excluding info-level) in one
+    # pass, grouped by workstation as (mount failures, connectivity
+    # issues, other issues)
+    ws_issues = {}
     
     for result in results:
+        if result['online']:
+            online += 1
         workstation = result['workstation']
         for issue in result.get('issues', []):
             # Skip info-level issues in the report
             if issue.get('severity') == 'info':
                 continue
-                
-            if issue.get('type') == 'mount_failure':
-                mount_failures.append((workstation, issue))
-            elif issue.get('type') == 'connectivity':
-                connectivity_issues.append((workstation, issue))
-            else:
-                other_issues.append((workstation, issue))
+            
+            buckets = ws_issues.setdefault(workstation, ([], [], []))
+            buckets[ISSUE_BUCKET.get(issue.get('type'), 2)].append(issue)
     
     # Count workstations with actual issues (not info-level)
-    with_issues = len(set(w for w, _ in mount_failures + connectivity_issues + other_issues))
-    
-    # Build report
-    lines = [
-        "=" * 70,
-        "NAS Workstation Mount Status Report",
-        f"Generated: {datetime.datetime.now()}",
-        f"Control Host: {socket.gethostname()}",
-        f"User: {os.environ.get('USER', 'unknown')}",
-        "=" * 70,
-        "",
-        "SUMMARY:",
-        f"  Total Workstations: {total}",
-        f"  Online: {online}",
-        f"  Offline: {offline}",
-        f"  With Issues: {with_issues}",
-        ""
-    ]
-    
-    if mount_failures or connectivity_issues or other_issues:
-        lines.append("WORKSTATIONS WITH ISSUES:")
-        lines.append("-" * 70)
-        
-        # Group issues by workstation
-        ws_issues = {}
-        for ws, issue in mount_failures + connectivity_issues + other_issues:
-            if ws not in ws_issues:
-                ws_issues[ws] = []
-            ws_issues[ws].append(issue)
+    with_issues = len(ws_issues)
+    
+    # Build report into one buffer
+    buf = io.StringIO()
+    w = buf.write
+    rule = "=" * 70
+    w(f"{rule}\n"
+      f"NAS Workstation Mount Status Report\n"
+      f"Generated: {datetime.datetime.now()}\n"
+      f"Control Host: {myhost}\n"
+      f"User: {mynetid}\n"
+      f"{rule}\n"
+      f"\n"
+      f"SUMMARY:\n"
+      f"  Total Workstations: {total}\n"
+      f"  Online: {online}\n"
+      f"  Offline: {total - online}\n"
+      f"  With Issues: {with_issues}\n"
+      f"\n")
+    
+    if ws_issues:
+        w("WORKSTATIONS WITH ISSUES:\n")
+        w("-" * 70 + "\n")
         
         for workstation in sorted(ws_issues.keys()):
-            lines.append(f"{workstation}:")
+            w(f"{workstation}:\n")
+            mount_issues, conn_issues, other = ws_issues[workstation]
             
             # Show mount failures first (critical)
-            mount_issues = [i for i in ws_issues[workstation] if i.get('type') == 'mount_failure']
-            if mount_issues:
-                for issue in mount_issues:
-                    lines.append(f"  Mount Failure: {issue.get('description', issue.get('mount_point', 'Unknown'))}")
+            for issue in mount_issues:
+                w(f"  Mount Failure: {issue.get('description', issue.get('mount_point', 'Unknown'))}\n")
             
             # Show connectivity issues (warnings)
-            conn_issues = [i for i in ws_issues[workstation] if i.get('type') == 'connectivity']
-            if conn_issues:
-                for issue in conn_issues:
-                    lines.append(f"  Connectivity Issue: {issue.get('description', 'Connection failed')}")
+            for issue in conn_issues:
+                w(f"  Connectivity Issue: {issue.get('description', 'Connection failed')}\n")
             
             # Show other issues
-            other = [i for i in ws_issues[workstation] if i.get('type') not in ['mount_failure', 'connectivity']]
-            if other:
-                for issue in other:
-                    lines.append(f"  {issue.get('type', 'Issue')}: {issue.get('description', 'Unknown')}")
+            for issue in other:
+                w(f"  {issue.get('type', 'Issue')}: {issue.get('description', 'Unknown')}\n")
     else:
-        lines.append("All workstations have healthy NAS mounts")
+        w("All workstations have healthy NAS mounts\n")
     
-    lines.append("")
-    lines.append("=" * 70)
+    w(f"\n{rule}")
     
-    return "\n".join(lines)
+    return buf.getvalue()
 
-@trap
-def should_suppress_notification() -> bool:
+def _is_quiet_hour(config: types.SimpleNamespace, weekday: int, current_hour: int) -> bool:
     """
-    Check if we're in off-hours or weekend suppression period.
+    Whether notifications are suppressed in this hour of the week
+    (weekday 0=Monday, 4=Friday, 5=Saturday, 6=Sunday).
     """
-    global myconfig
-    
-    if not hasattr(myconfig, 'off_hours_start') or not hasattr(myconfig, 'off_hours_end'):
+    if not hasattr(config, 'off_hours_start') or not hasattr(config, 'off_hours_end'):
         return False  # If not configured, never suppress
     
-    now = datetime.datetime.now()
-    current_hour = now.hour
-    weekday = now.weekday()  # 0=Monday, 4=Friday, 5=Saturday, 6=Sunday
-    
     # Check weekend suppression
-    if hasattr(myconfig, 'suppress_weekends') and myconfig.suppress_weekends:
+    if hasattr(config, 'suppress_weekends') and config.suppress_weekends:
         # Friday after 6 PM
         if weekday == 4 and current_hour >= 18:
             return True
@@ -595,8 +1278,8 @@ def should_suppress_notification() -> bool:
             return True
     
     # Check daily off-hours
-    start = myconfig.off_hours_start
-    end = myconfig.off_hours_end
+    start = config.off_hours_start
+    end = config.off_hours_end
     
     # Handle overnight periods (e.g., 18:00 to 06:00)
     if start > end:
@@ -604,24 +1287,70 @@ def should_suppress_notification() -> bool:
     else:
         return start <= current_hour < end
 
-def send_notification(subject: str, message: str):
+@trap
+def should_suppress_notification() -> bool:
     """
-    Send email notification.
+    Check if we're in off-hours or weekend suppression period.
+    """
+    global myconfig
+    
+    now = datetime.datetime.now()
+    return bool(myconfig._quiet_hours[now.weekday() * 24 + now.hour])
+
+def _get_smtp() -> smtplib.SMTP:
+    """
+    Return the open SMTP session, reconnecting if the server has since
+    dropped it (a NOOP tells us which).
+    """
+    global _smtp_conn
+    
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPException, OSError):
+            pass
+        _close_smtp()
+    
+    _smtp_conn = smtplib.SMTP(myconfig.smtp_server, myconfig.smtp_port,
+                              timeout=getattr(myconfig, 'smtp_timeout', DEFAULT_SMTP_TIMEOUT))
+    return _smtp_conn
+
+def _close_smtp() -> None:
+    """QUIT the shared SMTP session, if any."""
+    global _smtp_conn
+    
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except (smtplib.SMTPException, OSError):
+            _smtp_conn.close()
+        _smtp_conn = None
+
+def send_notification(subject: str, message: str, suppress: bool = None) -> bool:
+    """
+    Send email notification. suppress is the caller's off-hours decision
+    for this cycle; if None it is made here.
+    
+    Returns False only if the email could not be sent, so the caller can
+    keep what it reported for another try; a disabled or suppressed
+    notification counts as handled.
     """
     global myconfig
     global logger
     
     if not myconfig.send_notifications:
-        return
+        return True
     
-    if should_suppress_notification():
+    if suppress is None:
+        suppress = should_suppress_notification()
+    if suppress:
         logger.info("Notification suppressed due to off-hours/weekend setting")
         # Store for later
-        db.store_off_hours_issue(message)
-        return
+        db.store_off_hours_issue('unknown', 'general', message)
+        return True
     
     try:
-        import smtplib
         from email.mime.text import MIMEText
         from email.mime.multipart import MIMEMultipart
         
@@ -631,13 +1360,19 @@ def send_notification(subject: str, message: str):
         msg['Subject'] = subject
         msg.attach(MIMEText(message, 'plain'))
         
-        with smtplib.SMTP(myconfig.smtp_server, myconfig.smtp_port) as server:
-            server.send_message(msg)
+        try:
+            _get_smtp().send_message(msg)
+        except smtplib.SMTPServerDisconnected:
+            # Dropped between the NOOP and the send; one fresh try
+            _close_smtp()
+            _get_smtp().send_message(msg)
         
         logger.info(f"Notification sent: {subject}")
+        return True
         
     except Exception as e:
         logger.error(f"Failed to send notification: {e}")
+        return False
 
 def send_off_hours_summary():
     """
@@ -653,37 +1388,35 @@ def send_off_hours_summary():
         logger.info("No off-hours issues to report")
         return
     
+    # Anything stored while this summary goes out waits for the next one
+    last_id = max(issue['id'] for issue in issues)
+    
     # Group and classify issues
     by_workstation = {}
     mount_failure_count = 0
     connectivity_count = 0
     
-    for issue_id, workstation, issue_type, details, detected_at in issues:
+    for issue in issues:
+        workstation = issue['workstation']
+        details = issue['details']
+        detected_at = issue['detected_at']
         if workstation not in by_workstation:
             by_workstation[workstation] = {'mount_failures': [], 'connectivity': [], 'other': []}
         
-        # Skip info-level issues (HIV_flaps configuration)
-        if 'hiv_flaps' in details.lower() and 'protocol' in details.lower():
+        # Classified when stored (see handle_issues)
+        issue_type = issue['issue_type']
+        if issue_type == 'config_info':
             continue
-            
-        # Try to classify based on the details
-        if 'mount' in details.lower() and 'ssh' not in details.lower() and 'connection' not in details.lower():
-            by_workstation[workstation]['mount_failures'].append({
-                'details': details,
-                'time': detected_at
-            })
+        
+        entry = {'details': details, 'time': detected_at}
+        if issue_type == 'mount_failure':
+            by_workstation[workstation]['mount_failures'].append(entry)
             mount_failure_count += 1
-        elif 'ssh' in details.lower() or 'connection' in details.lower() or 'timeout' in details.lower():
-            by_workstation[workstation]['connectivity'].append({
-                'details': details,
-                'time': detected_at
-            })
+        elif issue_type == 'connectivity':
+            by_workstation[workstation]['connectivity'].append(entry)
             connectivity_count += 1
         else:
-            by_workstation[workstation]['other'].append({
-                'details': details,
-                'time': detected_at
-            })
+            by_workstation[workstation]['other'].append(entry)
     
     # Remove workstations with no real issues
     by_workstation = {k: v for k, v in by_workstation.items() 
@@ -691,7 +1424,7 @@ def send_off_hours_summary():
     
     if not by_workstation:
         logger.info("No actionable off-hours issues to report")
-        db.clear_off_hours_issues()
+        db.clear_off_hours_issues(last_id)
         return
     
     # Generate enhanced summary report
@@ -699,7 +1432,7 @@ def send_off_hours_summary():
         "=" * 70,
         "NAS Workstation Monitor - Off-Hours Summary",
         f"Issues Detected: {datetime.datetime.now()}",
-        f"Control Host: {socket.gethostname()}",
+        f"Control Host: {myhost}",
         "=" * 70,
         "",
         f"Total Workstations with Issues: {len(by_workstation)}",
@@ -747,13 +1480,84 @@ def send_off_hours_summary():
     report = "\n".join(report_lines)
     
     # Send the summary
-    send_notification(
+    sent = send_notification(
         f"NAS Monitor Off-Hours Summary: {len(by_workstation)} Workstation(s) with Issues",
         report
     )
     
-    # Clear the off-hours issues after sending
-    db.clear_off_hours_issues()
+    # Clear the off-hours issues after sending; if the email failed they
+    # stay queued for the next summary
+    if sent:
+        db.clear_off_hours_issues(last_id)
+    else:
+        logger.warning(f"Keeping {len(issues)} off-hours issue(s) for the next summary")
+
+def handle_issues(ctx: MonitorCtx, results: List[Dict], summary: str) -> None:
+    """
+    Decide what to do with a cycle's critical issues (mount failures and
+    offline workstations), skipping workstations in suppress_notifications_for.
+    
+    During off-hours, each reportable workstation is queued as one
+    off_hours_issues row for the morning summary and no email is built.
+    Otherwise an alert carrying the cycle summary is sent.
+    """
+    cfg, logger, db = ctx.cfg, ctx.logger, ctx.db
+    
+    if not cfg.send_notifications:
+        return
+    
+    # Decide once, so the queue-or-send choice and the send agree
+    suppress_now = should_suppress_notification()
+    suppressed = getattr(cfg, 'suppress_notifications_for', [])
+    
+    # One pass sorts each workstation's critical issues into reportable
+    # or suppressed
+    reportable_offline = []
+    reportable_failures = []
+    suppressed_offline = []
+    suppressed_any = False
+    for r in results:
+        workstation = r['workstation']
+        if not r.get('online', True):
+            if workstation in suppressed:
+                suppressed_offline.append(workstation)
+            else:
+                reportable_offline.append(workstation)
+            continue
+        failures = [i for i in r.get('issues', [])
+                    if i.get('type') == 'mount_failure' and i.get('severity') == 'critical']
+        if failures:
+            if workstation in suppressed:
+                suppressed_any = True
+            else:
+                reportable_failures.append((workstation, failures))
+    
+    if suppressed_offline:
+        logger.info(f"Suppressed offline notifications for: {', '.join(suppressed_offline)}")
+    
+    if not reportable_offline and not reportable_failures:
+        if suppressed_offline or suppressed_any:
+            logger.info("All critical issues are for suppressed workstations - no notification sent")
+        return
+    
+    if suppress_now:
+        issues = [(ws, 'connectivity', f"{ws}: Workstation offline")
+                  for ws in reportable_offline]
+        issues += [(ws, 'mount_failure', f"{ws}: {issue['description']}")
+                   for ws, failures in reportable_failures for issue in failures]
+        db.store_off_hours_issues(issues)
+        logger.info(f"Notification suppressed due to off-hours/weekend setting; "
+                    f"queued {len(issues)} issue(s) for the morning summary")
+        return
+    
+    # Create descriptive subject
+    alerts = []
+    if reportable_offline:
+        alerts.append(f"{len(reportable_offline)} offline: {', '.join(reportable_offline)}")
+    if reportable_failures:
+        alerts.append(f"{len(reportable_failures)} mount failures")
+    
+    send_notification(f"NAS Alert: {' | '.join(alerts)}", summary, suppress=False)
 
 def main():
     """Main entry point."""
@@ -784,107 +1588,75 @@ def main():
     if args.nice > 0:
         os.nice(args.nice)
     
-    # Load configuration (using 'rb' for tomli compatibility)
-    with open(args.config, 'rb') as f:
-        config_dict = toml.load(f)
-    
-    # Convert to object notation
-    class Config:
-        def __init__(self, d):
-            for key, value in d.items():
-                if isinstance(value, dict):
-                    setattr(self, key, Config(value))
-                else:
-                    setattr(self, key, value)
-    
-    myconfig = Config(config_dict)
+    # Load configuration
+    myconfig = load_config(args.config)
     
     # Initialize logger
     logger = URLogger(logfile=myconfig.log_file, level='DEBUG' if args.verbose else 'INFO')
     
     # Initialize database
     db = NASMonitorDB(myconfig.database, myconfig.schema_file)
+    if db.journal_mode != 'wal':
+        logger.warning(f"{myconfig.database} is on {db.fstype}; "
+                       f"using journal_mode={db.journal_mode} instead of WAL")
+    
+    ctx = MonitorCtx(myconfig, logger, db)
     
     # Handle off-hours summary
     if args.send_off_hours_summary:
         send_off_hours_summary()
+        _close_smtp()
         return 0
     
-    # Run monitoring
+    # One worker pool for the life of the monitor, reused every cycle
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=pool_size(myconfig, len(myconfig.workstations)))
+    warm_dns_cache((ws.host for ws in myconfig.workstations), executor)
+    
+    # Run monitoring; cycle N starts at start + N*time_interval however long
+    # the cycles take
+    interval = myconfig.time_interval
+    next_deadline = time.monotonic() + interval
     try:
         while True:
-            results = monitor_all_workstations(myconfig.workstations)
-            
-            # Generate and print summary
-            summary = generate_summary_report(results)
-            print(summary)
-            
-            # Log to file
-            logger.info(summary)
-            # Send notifications for critical issues (mount failures AND offline workstations)
-            critical_issues = []
-            offline_workstations = []
-            for r in results:
-                # Check if workstation is offline
-                if not r.get('online', True):
-                    offline_workstations.append(r['workstation'])
-                    critical_issues.append(r)
-                # Check for mount failures
-                for issue in r.get('issues', []):
-                    if issue.get('type') == 'mount_failure' and issue.get('severity') == 'critical':
-                        if r not in critical_issues:  # Avoid duplicates
-                            critical_issues.append(r)
-                        break
-            
-            if critical_issues:
-                # Check for suppressed workstations
-                suppressed = []
-                if hasattr(myconfig, 'suppress_notifications_for'):
-                    suppressed = myconfig.suppress_notifications_for
-                
-                # Create descriptive subject
-                alerts = []
-                
-                # Filter offline workstations
-                if offline_workstations:
-                    reportable_offline = [ws for ws in offline_workstations if ws not in suppressed]
-                    suppressed_offline = [ws for ws in offline_workstations if ws in suppressed]
-                    
-                    if reportable_offline:
-                        alerts.append(f"{len(reportable_offline)} offline: {', '.join(reportable_offline)}")
-                    
-                    # Log suppressed notifications
-                    if suppressed_offline:
-                        logger.info(f"Suppressed offline notifications for: {', '.join(suppressed_offline)}")
+            # One transaction for the cycle's rows and any queued
+            # off-hours issues
+            with db.batch():
+                results = monitor_all_workstations(ctx, myconfig.workstations, executor)
                 
-                # Count mount failures (excluding suppressed workstations)
-                mount_failures = len([r for r in critical_issues 
-                                    if r.get('online', True) 
-                                    and r.get('workstation') not in suppressed])
-                if mount_failures > 0:
-                    alerts.append(f"{mount_failures} mount failures")
+                # Generate and print summary
+                summary = generate_summary_report(results)
+                print(summary)
                 
-                # Only send notification if there are non-suppressed issues
-                if alerts:
-                    send_notification(
-                        f"NAS Alert: {' | '.join(alerts)}",
-                        summary
-                    )
-                else:
-                    logger.info("All critical issues are for suppressed workstations - no notification sent")
+                # Log to file
+                logger.info(summary)
+                # Send notifications (or queue them for the morning summary)
+                handle_issues(ctx, results, summary)
 
             if args.once:
                 break
             
-            # Wait for next cycle
-            time.sleep(myconfig.time_interval)
+            # Wait for next cycle; after an overrun, skip the cycles we
+            # missed rather than running them back to back
+            now = time.monotonic()
+            if now > next_deadline + interval:
+                logger.warning(f"Cycle overran by {now - next_deadline:.0f}s; "
+                               f"skipping missed cycles")
+                next_deadline = now
+            time.sleep(max(0, next_deadline - now))
+            next_deadline += interval
             
     except KeyboardInterrupt:
         logger.info("Monitor stopped by user")
+        executor.shutdown(wait=False, cancel_futures=True)
         return 0
     except Exception as e:
         logger.error(f"Monitor failed: {e}")
         return 1
+    finally:
+        executor.shutdown(wait=False)
+        close_ssh_pool()
+        _close_smtp()
 
 if __name__ == "__main__":
     sys.exit(main())
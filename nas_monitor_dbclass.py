@@ -6,56 +6,510 @@ Database operations for NAS mount monitoring
 Fixed version with correct column names and placeholder counts
 """
 
+import atexit
+import concurrent.futures
 import sqlite3
-import datetime
 import os
-from typing import List, Tuple, Optional, Dict, Any
-from pathlib import Path
+import re
+import threading
+import time
+from typing import List, Tuple, Optional, Dict, Any, Iterator
+from urllib.parse import quote
 from contextlib import contextmanager
 
+# WAL needs shared memory that network filesystems cannot provide
+NETWORK_FILESYSTEMS = frozenset(('nfs', 'nfs4', 'cifs', 'smb3', 'smbfs',
+                                 'fuse.sshfs'))
+
+# Seconds a connection waits for another process's lock (a nas_query
+# read on a rollback journal, a --send-off-hours-summary run) before
+# giving up with 'database is locked'
+BUSY_TIMEOUT = 30
+
+# PRAGMA user_version of a database _init_database() has brought fully up
+# to date; later starts skip the schema work. Bump it whenever the schema
+# file or the migrations in _init_database() change
+SCHEMA_VERSION = 1
+
+# Compiled statements the shared connection keeps. Room for every query
+# in this class plus the schema file's statements run at startup, so
+# those cannot push the INSERT_* statements out
+STATEMENT_CACHE_SIZE = 256
+
+# Hours of history kept when monitor_config has no row
+DEFAULT_KEEP_HOURS = 168
+
+# Seconds get_config() reuses its answer; update_config() from another
+# process (nas_query) is seen by a running monitor within this time
+CONFIG_CACHE_TTL = 300
+
+# PRAGMA auto_vacuum value for INCREMENTAL
+AUTO_VACUUM_INCREMENTAL = 2
+
+# Freed pages returned to the filesystem per cleanup_old_records()
+INCREMENTAL_VACUUM_PAGES = 1000
+
+def hours_ago(hours: int) -> str:
+    """
+    datetime('now', ?) modifier for a look-back window, bound as a
+    parameter so the statement text is the same for every window.
+    """
+    return f'-{int(hours)} hours'
+
+# Object a schema statement creates, so _apply_schema() can skip it
+SCHEMA_CREATE_RE = re.compile(
+    r'^\s*CREATE\s+(?:TABLE|INDEX|VIEW|TRIGGER)\s+IF\s+NOT\s+EXISTS\s+(\w+)',
+    re.IGNORECASE | re.MULTILINE)
+
+SCHEMA_PRAGMA_RE = re.compile(r'^\s*PRAGMA\b', re.IGNORECASE | re.MULTILINE)
+
+# Page cache for a read_only connection, in KiB (negative, as SQLite takes it)
+READER_CACHE_SIZE = -65536
+
+# batch() writes its queue early once this many mount/software rows wait
+BATCH_MAX_ROWS = 1000
+
+def filesystem_type(path: str) -> Optional[str]:
+    """
+    Type of the filesystem holding path, from the longest matching
+    /proc/mounts entry; None if it cannot be determined.
+    """
+    path = os.path.realpath(path)
+    best, fstype = '', None
+    try:
+        with open('/proc/mounts') as f:
+            for line in f:
+                fields = line.split()
+                if len(fields) < 3:
+                    continue
+                mount_point = fields[1].replace('\\040', ' ')
+                if ((path == mount_point or
+                     path.startswith(mount_point.rstrip('/') + '/')) and
+                    len(mount_point) >= len(best)):
+                    best, fstype = mount_point, fields[2]
+    except OSError:
+        return None
+    return fstype
+
 class NASMonitorDB:
     """
     Database interface for NAS mount monitoring.
     """
     
-    def __init__(self, db_path: str, schema_file: str = None):
+    # The hot inserts, written once and shared by the direct and batch()
+    # paths, so each is parsed once per connection and then served from
+    # sqlite3's statement cache
+    # An UPSERT rather than INSERT OR REPLACE: REPLACE deletes the old row,
+    # wiping the columns maintained elsewhere (last_successful_check,
+    # last_connectivity_issue, mount_status)
+    INSERT_STATUS = '''
+        INSERT INTO workstation_status
+        (workstation, is_online, connectivity_status, last_check, last_seen,
+         active_users, user_list, checked_by)
+        VALUES (?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP, ?, ?, ?)
+        ON CONFLICT(workstation) DO UPDATE SET
+            is_online = excluded.is_online,
+            connectivity_status = excluded.connectivity_status,
+            last_check = excluded.last_check,
+            last_seen = excluded.last_seen,
+            active_users = excluded.active_users,
+            user_list = excluded.user_list,
+            checked_by = excluded.checked_by
+    '''
+    
+    INSERT_MOUNT_STATUS = '''
+        INSERT INTO workstation_mount_status
+        (timestamp, workstation, mount_point, device, filesystem, status,
+         response_time_ms, error_message, action_taken, monitored_by)
+        VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    
+    INSERT_SOFTWARE_CHECK = '''
+        INSERT INTO software_availability
+        (timestamp, workstation, software_name, mount_point, is_accessible,
+         check_time_ms)
+        VALUES (COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?, ?, ?)
+    '''
+    
+    INSERT_OFF_HOURS_ISSUE = '''
+        INSERT INTO off_hours_issues
+        (workstation, issue_type, details)
+        VALUES (?, ?, ?)
+    '''
+    
+    def __init__(self, db_path: str, schema_file: str = None,
+                 read_only: bool = False):
         """
         Initialize database connection and ensure schema exists.
         
         Args:
             db_path: Path to SQLite database file
             schema_file: Optional path to schema SQL file
+            read_only: Open the database with mode=ro and query_only for
+                a reader such as nas_query; the schema is left to the
+                monitor, so the database must already exist
         """
         self.db_path = db_path
         self.schema_file = schema_file
+        self.read_only = read_only
+        self.monitored_by = os.environ.get('USER', 'unknown')
+        
+        # Workstations are monitored from a thread pool; serialize our own
+        # access so concurrent writers don't contend for SQLite's write lock
+        self._lock = threading.RLock()
+        
+        # Opened by the first _get_connection() and kept until close();
+        # depth counts nested _get_connection() blocks
+        self._conn = None
+        self._conn_depth = 0
+        
+        # Thread inside transaction() or snapshot(), else None. Compared
+        # with the caller's thread (_owns_transaction()), since another
+        # thread's open transaction says nothing about the caller's
+        self._txn_owner = None
+        atexit.register(self.close)
+        
+        # Rows queued by record_*/update_workstation_status while a batch()
+        # is open; None when writes go straight to the database. It has
+        # its own lock, so monitor threads can queue rows while a full
+        # queue is being written by the background writer
+        self._pending = None
+        self._pending_lock = threading.Lock()
+        
+        # Single-thread executor (started on first use) for batch()
+        # queues written early, and the futures of those still running
+        self._writer = None
+        self._writes = []
+        
+        # (monitor_config as a dict, expiry on time.monotonic()) or None
+        self._config_cache = None
+        
+        # Set by _init_database(); the caller can warn when WAL was skipped
+        self.fstype = filesystem_type(os.path.dirname(os.path.abspath(db_path)))
+        self.journal_mode = None
         
         # Create database if it doesn't exist
-        self._init_database()
+        if read_only:
+            with self._get_connection() as conn:
+                self.journal_mode = conn.execute('PRAGMA journal_mode').fetchone()[0]
+        else:
+            self._init_database()
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the connection every method shares."""
+        # Monitor threads take turns on it under self._lock
+        if self.read_only:
+            # Under WAL a reader on its own connection never waits for the
+            # monitor's writes
+            uri = f'file:{quote(os.path.abspath(self.db_path))}?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, timeout=BUSY_TIMEOUT,
+                                   check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            conn.execute('PRAGMA query_only=1')
+            # The reliability and software views scan a week of rows; a
+            # reader has no commits to sync or checkpoint
+            conn.execute(f'PRAGMA cache_size={READER_CACHE_SIZE}')
+        else:
+            conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT,
+                                   check_same_thread=False,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+            self._set_synchronous(conn)
+            conn.execute('PRAGMA cache_size=-20000')
+            conn.execute('PRAGMA wal_autocheckpoint=1000')
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        return conn
+    
+    def _set_synchronous(self, conn: sqlite3.Connection):
+        """
+        In WAL mode NORMAL skips the fsync on every commit and is still
+        safe against corruption; a rollback journal (the network
+        filesystem fallback, or before _init_database() has run) needs
+        FULL for that.
+        """
+        if self.journal_mode == 'wal':
+            conn.execute('PRAGMA synchronous=NORMAL')
+        else:
+            conn.execute('PRAGMA synchronous=FULL')
     
     @contextmanager
     def _get_connection(self):
-        """Context manager for database connections."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """
+        Context manager for the shared database connection (one thread at
+        a time). It stays open between calls, keeping its page cache and
+        compiled statements; whatever the outermost user leaves
+        uncommitted is rolled back, as closing a connection used to do.
+        """
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+            conn = self._conn
+            self._conn_depth += 1
+            try:
+                yield conn
+            finally:
+                self._conn_depth -= 1
+                if not self._conn_depth and conn.in_transaction:
+                    conn.rollback()
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Run the block as one explicit BEGIN IMMEDIATE ... COMMIT on the
+        shared connection, rolled back if it raises. Methods called inside
+        it (and a transaction() nested in it) join it instead of committing
+        on their own, so a run of writes costs a single commit.
+        
+        The connection is switched to isolation_level None for the
+        duration, so that sqlite3 starts no implicit transactions of its
+        own. The connection lock is held throughout: only wrap code that
+        does its database work on the calling thread.
+        """
+        with self._get_connection() as conn:
+            if self._owns_transaction():
+                yield conn
+                return
+            
+            # Take the write lock before the first statement rather than
+            # upgrading to it mid-transaction, where another writer (a
+            # separate --send-off-hours-summary run) could make it fail
+            conn.commit()
+            conn.isolation_level = None
+            conn.execute('BEGIN IMMEDIATE')
+            self._txn_owner = threading.get_ident()
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            else:
+                conn.execute('COMMIT')
+            finally:
+                self._txn_owner = None
+                # Put back the default for the methods that commit() themselves
+                conn.isolation_level = ''
+    
+    @contextmanager
+    def snapshot(self):
+        """
+        Run the block's queries against one consistent view of the
+        database: a deferred BEGIN ... COMMIT on the shared connection.
+        Unlike transaction() it takes no write lock until something
+        writes, so it works on a read_only connection and never holds up
+        the monitor. Inside a transaction() (or another snapshot()) it
+        joins that one.
+        """
+        with self._get_connection() as conn:
+            if self._owns_transaction():
+                yield conn
+                return
+            
+            conn.commit()
+            conn.isolation_level = None
+            conn.execute('BEGIN')
+            self._txn_owner = threading.get_ident()
+            try:
+                yield conn
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+                raise
+            else:
+                conn.execute('COMMIT')
+            finally:
+                self._txn_owner = None
+                conn.isolation_level = ''
+    
+    def _owns_transaction(self) -> bool:
+        """True if the calling thread is inside transaction() or snapshot()."""
+        return self._txn_owner == threading.get_ident()
+    
+    @staticmethod
+    def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """
+        Cursor that returns plain tuples instead of sqlite3.Row, for the
+        get_* methods whose callers index rows by position.
+        """
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+    
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit, unless an open transaction() will do it at its end."""
+        if not self._owns_transaction():
+            conn.commit()
+    
+    @contextmanager
+    def batch(self):
+        """
+        Queue mount, software, workstation status and off-hours issue writes
+        made inside the block and write them in a single transaction when it
+        ends, instead of committing each row as it is recorded. A batch()
+        opened inside another one joins it, so a whole monitoring cycle can
+        share the outer transaction.
+        """
+        with self._pending_lock:
+            if self._pending is not None:
+                nested = True
+            else:
+                nested = False
+                self._pending = self._new_pending()
+        if nested:
+            yield self
+            return
+        
         try:
-            yield conn
+            yield self
         finally:
-            conn.close()
+            with self._pending_lock:
+                pending, self._pending = self._pending, None
+            # Queues written early come first
+            self._wait_for_writes()
+            self._flush(pending)
+    
+    @staticmethod
+    def _new_pending() -> Dict[str, Any]:
+        """An empty batch() queue."""
+        return {'status': {}, 'mount': [], 'software': [], 'off_hours': []}
+    
+    def _queue(self, kind: str, rows: List[tuple], key: str = None):
+        """
+        Queue rows for the open batch() (a single row under key, replacing
+        any earlier one, if given), writing the queue out early once
+        BATCH_MAX_ROWS rows are waiting. With no batch open the rows are
+        written straight away as a batch of their own, so every write
+        goes through _flush().
+        
+        The early write is handed to the background writer, so the
+        monitor thread that filled the queue goes back to its checks.
+        """
+        full = None
+        with self._pending_lock:
+            pending = self._pending
+            one_off = pending is None
+            if one_off:
+                pending = self._new_pending()
+            
+            if key is None:
+                pending[kind].extend(rows)
+            else:
+                pending[kind][key] = rows[-1]
+            
+            if not one_off and \
+                    len(pending['mount']) + len(pending['software']) >= BATCH_MAX_ROWS:
+                self._pending = self._new_pending()
+                full = pending
+        
+        if one_off:
+            self._flush(pending)
+        elif full is not None:
+            self._flush_in_background(full)
+    
+    def _flush_in_background(self, pending: Dict[str, Any]):
+        """
+        Write a full batch() queue on the writer thread. At most one such
+        write is outstanding: the caller first waits for the previous one,
+        so queues cannot pile up in memory faster than they are written.
+        """
+        # Inside this thread's transaction() the rows belong to it. Another
+        # thread's (the writer's own _flush) is no reason to write here
+        if self._owns_transaction():
+            self._flush(pending)
+            return
+        
+        self._wait_for_writes()
+        with self._pending_lock:
+            if self._writer is None:
+                self._writer = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix='nas-db-writer')
+            self._writes.append(self._writer.submit(self._flush, pending))
+    
+    def _wait_for_writes(self):
+        """
+        Wait for the writer thread to finish the queues handed to it,
+        raising the first error it hit.
+        """
+        with self._pending_lock:
+            writes, self._writes = self._writes, []
+        for write in writes:
+            write.result()
+    
+    def _flush(self, pending: Dict[str, Any]):
+        """Write rows queued by batch() in one transaction."""
+        if not any(pending.values()):
+            return
+        
+        with self.transaction() as conn:
+            cursor = conn.cursor()
+            
+            # Status first, so the mount triggers update the new rows
+            cursor.executemany(self.INSERT_STATUS, list(pending['status'].values()))
+            cursor.executemany(self.INSERT_MOUNT_STATUS, pending['mount'])
+            cursor.executemany(self.INSERT_SOFTWARE_CHECK, pending['software'])
+            cursor.executemany(self.INSERT_OFF_HOURS_ISSUE, pending['off_hours'])
+            
+            # New checks change the reliability figures; recompute them
+            # once here rather than on every report
+            if pending['mount']:
+                self._refresh_reliability(cursor)
+    
+    def _refresh_reliability(self, cursor: sqlite3.Cursor):
+        """Rebuild workstation_reliability_cache from its view."""
+        cursor.execute('DELETE FROM workstation_reliability_cache')
+        cursor.execute('''
+            INSERT INTO workstation_reliability_cache
+            (workstation, total_checks, successful_checks, failed_checks,
+             success_rate, last_check)
+            SELECT workstation, total_checks, successful_checks, failed_checks,
+                   success_rate, last_check
+            FROM workstation_reliability
+        ''')
     
     def _init_database(self):
         """Initialize database with schema."""
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
+            # A database an earlier start brought up to SCHEMA_VERSION only
+            # needs its journal mode checked
+            cursor.execute('PRAGMA user_version')
+            if cursor.fetchone()[0] >= SCHEMA_VERSION:
+                self._set_journal_mode(conn)
+                return
+            
             # Check if we need to apply schema
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
             tables = [row[0] for row in cursor.fetchall()]
             
-            if not tables and self.schema_file and Path(self.schema_file).exists():
-                # Apply schema from file
-                with open(self.schema_file, 'r') as f:
-                    schema_sql = f.read()
-                conn.executescript(schema_sql)
+            # Let cleanup_old_records() hand freed pages back a few at a
+            # time. A new database only needs the pragma before its first
+            # table (and before switching to WAL, which fixes the setting);
+            # an existing one is rebuilt by one full VACUUM
+            cursor.execute('PRAGMA auto_vacuum')
+            if cursor.fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+                cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+                if tables:
+                    conn.execute('VACUUM')
+            
+            self._set_journal_mode(conn)
+            
+            # Older databases could hold several open connectivity issues
+            # for a workstation; close all but the newest before
+            # idx_connectivity_open is created
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'idx_connectivity_open'")
+            if 'connectivity_issues' in tables and not cursor.fetchone():
+                cursor.execute('''
+                    UPDATE connectivity_issues
+                    SET resolved = 1, resolved_at = CURRENT_TIMESTAMP
+                    WHERE resolved = 0 AND id NOT IN (
+                        SELECT MAX(id) FROM connectivity_issues
+                        WHERE resolved = 0 GROUP BY workstation)
+                ''')
+                conn.commit()
+            
+            schema_applied = bool(self.schema_file) and self._apply_schema(conn)
             
             # Add connectivity tracking table if it doesn't exist
             cursor.execute('''
@@ -77,13 +531,112 @@ class NASMonitorDB:
                 ON connectivity_issues(workstation, timestamp DESC)
             ''')
             
+            # At most one open connectivity issue per workstation, which
+            # record_connectivity_issue() upserts
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_connectivity_open
+                ON connectivity_issues(workstation) WHERE resolved = 0
+            ''')
+            
+            # The next two tables come from the schema file; without it
+            # (e.g. a nas_query run on a new database) they do not exist
+            
+            # cleanup_old_records() deletes software checks by age alone
+            if schema_applied or 'software_availability' in tables:
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_software_timestamp
+                    ON software_availability(timestamp)
+                ''')
+            
+            # Index only the unnotified off-hours issues
+            if schema_applied or 'off_hours_issues' in tables:
+                cursor.execute('DROP INDEX IF EXISTS idx_off_hours')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_off_hours_pending
+                    ON off_hours_issues(detected_at) WHERE notified = 0
+                ''')
+            
+            # Add the materialized reliability table if it doesn't exist
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS workstation_reliability_cache (
+                    workstation TEXT PRIMARY KEY,
+                    total_checks INTEGER,
+                    successful_checks INTEGER,
+                    failed_checks INTEGER,
+                    success_rate REAL,
+                    last_check DATETIME,
+                    refreshed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            
+            # Only once the schema file has been applied is the database
+            # complete; a nas_query run on a new one (no schema file) must
+            # not let the monitor skip it
+            if schema_applied:
+                cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            
             conn.commit()
     
+    def _set_journal_mode(self, conn: sqlite3.Connection):
+        """
+        Readers (nas_query) no longer block the monitor's writes.
+        journal_mode is stored in the database file, so this is a no-op
+        once set; it is put back to a rollback journal on a network
+        filesystem.
+        """
+        wanted = ('DELETE' if self.fstype in NETWORK_FILESYSTEMS
+                  else 'WAL')
+        self.journal_mode = conn.execute(f'PRAGMA journal_mode={wanted}').fetchone()[0]
+        self._set_synchronous(conn)
+    
+    def _apply_schema(self, conn: sqlite3.Connection) -> bool:
+        """
+        Create whatever the schema file defines that the database lacks,
+        in one transaction. Statements are split with
+        sqlite3.complete_statement() (so trigger bodies stay whole) and
+        CREATE ... IF NOT EXISTS for an object already in sqlite_master is
+        skipped, so objects added to the schema later reach existing
+        databases (once SCHEMA_VERSION is bumped).
+        
+        Returns:
+            False if the schema file does not exist, True otherwise
+        """
+        # Open directly rather than checking exists() first
+        try:
+            with open(self.schema_file, 'r') as f:
+                schema_sql = f.read()
+        except FileNotFoundError:
+            return False
+        
+        existing = {row[0] for row in conn.execute('SELECT name FROM sqlite_master')}
+        
+        statements = []
+        buf = ''
+        for line in schema_sql.splitlines(keepends=True):
+            buf += line
+            if not sqlite3.complete_statement(buf):
+                continue
+            stmt, buf = buf.strip(), ''
+            created = SCHEMA_CREATE_RE.search(stmt)
+            if created and created.group(1) in existing:
+                continue
+            # auto_vacuum is set by _init_database() before any table
+            if SCHEMA_PRAGMA_RE.search(stmt):
+                continue
+            statements.append(stmt)
+        
+        with self.transaction():
+            for stmt in statements:
+                conn.execute(stmt)
+        
+        return True
+    
     def record_mount_status(self, workstation: str, mount_point: str, 
                            device: str, filesystem: str, status: str,
                            response_time_ms: float = None,
                            error_message: str = None,
-                           action_taken: str = None):
+                           action_taken: str = None,
+                           timestamp: str = None):
         """
         Record mount status check result.
         
@@ -96,20 +649,13 @@ class NASMonitorDB:
             response_time_ms: Optional response time
             error_message: Optional error message
             action_taken: Optional action taken
+            timestamp: Optional UTC timestamp shared by a monitoring cycle
+                       (defaults to CURRENT_TIMESTAMP)
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO workstation_mount_status
-                (workstation, mount_point, device, filesystem, status,
-                 response_time_ms, error_message, action_taken, monitored_by)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (workstation, mount_point, device, filesystem, status,
-                  response_time_ms, error_message, action_taken,
-                  os.environ.get('USER', 'unknown')))
-            
-            conn.commit()
+        row = (timestamp, workstation, mount_point, device, filesystem, status,
+               response_time_ms, error_message, action_taken, self.monitored_by)
+        
+        self._queue('mount', [row])
     
     def record_connectivity_issue(self, workstation: str, issue_type: str, 
                                  error_message: str = None):
@@ -124,31 +670,17 @@ class NASMonitorDB:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
-            # Check if there's an unresolved issue for this workstation
+            # Open a new issue, or update the workstation's open one
+            # (idx_connectivity_open allows only one)
             cursor.execute('''
-                SELECT id FROM connectivity_issues 
-                WHERE workstation = ? AND resolved = 0
-                ORDER BY timestamp DESC LIMIT 1
-            ''', (workstation,))
-            
-            existing = cursor.fetchone()
-            
-            if not existing:
-                # Create new issue record
-                cursor.execute('''
-                    INSERT INTO connectivity_issues
-                    (workstation, issue_type, error_message)
-                    VALUES (?, ?, ?)
-                ''', (workstation, issue_type, error_message))
-            else:
-                # Update existing issue
-                cursor.execute('''
-                    UPDATE connectivity_issues
-                    SET timestamp = CURRENT_TIMESTAMP,
-                        issue_type = ?,
-                        error_message = ?
-                    WHERE id = ?
-                ''', (issue_type, error_message, existing[0]))
+                INSERT INTO connectivity_issues
+                (workstation, issue_type, error_message)
+                VALUES (?, ?, ?)
+                ON CONFLICT(workstation) WHERE resolved = 0 DO UPDATE SET
+                    timestamp = CURRENT_TIMESTAMP,
+                    issue_type = excluded.issue_type,
+                    error_message = excluded.error_message
+            ''', (workstation, issue_type, error_message))
             
             # Update workstation status
             cursor.execute('''
@@ -158,7 +690,7 @@ class NASMonitorDB:
                 WHERE workstation = ?
             ''', (issue_type, workstation))
             
-            conn.commit()
+            self._commit(conn)
     
     def resolve_connectivity_issues(self, workstation: str):
         """
@@ -170,12 +702,13 @@ class NASMonitorDB:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
-            # Calculate duration and mark resolved
+            # Calculate duration (days to minutes) and mark resolved; the
+            # workstation has at most one open issue (idx_connectivity_open)
             cursor.execute('''
                 UPDATE connectivity_issues
                 SET resolved = 1,
                     resolved_at = CURRENT_TIMESTAMP,
-                    duration_minutes = (julianday(CURRENT_TIMESTAMP) - julianday(timestamp)) * 24 * 60
+                    duration_minutes = (julianday(CURRENT_TIMESTAMP) - julianday(timestamp)) * 1440
                 WHERE workstation = ? AND resolved = 0
             ''', (workstation,))
             
@@ -186,7 +719,7 @@ class NASMonitorDB:
                 WHERE workstation = ?
             ''', (workstation,))
             
-            conn.commit()
+            self._commit(conn)
     
     def update_workstation_status(self, workstation: str, is_online: bool,
                                  connectivity: str = None,
@@ -201,24 +734,18 @@ class NASMonitorDB:
             is_online: Whether workstation is reachable
             connectivity: Connectivity status (connected, ssh_failed, unreachable)
             active_users: Number of active users
-            user_list: Comma-separated list of users
+            user_list: Comma-separated distinct logins, or None if none
             checked_by: User running the check
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO workstation_status
-                (workstation, is_online, connectivity_status, last_seen,
-                 active_users, user_list, checked_by)
-                VALUES (?, ?, ?, CURRENT_TIMESTAMP, ?, ?, ?)
-            ''', (workstation, is_online, connectivity or 'unknown',
-                  active_users, user_list, checked_by))
-            
-            conn.commit()
+        row = (workstation, is_online, connectivity or 'unknown',
+               active_users, user_list, checked_by)
+        
+        # Only the last status recorded for a workstation matters
+        self._queue('status', [row], key=workstation)
     
     def record_software_check(self, workstation: str, software_name: str,
-                            mount_point: str, is_accessible: bool):
+                            mount_point: str, is_accessible: bool,
+                            timestamp: str = None, check_time_ms: float = None):
         """
         Record software accessibility check.
         
@@ -227,58 +754,46 @@ class NASMonitorDB:
             software_name: Name of software
             mount_point: Mount point where software is located
             is_accessible: Whether software is accessible
+            timestamp: Optional UTC timestamp shared by a monitoring cycle
+                       (defaults to CURRENT_TIMESTAMP)
+            check_time_ms: How long the caller's check took, if it timed it
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO software_availability
-                (workstation, software_name, mount_point, is_accessible,
-                 check_time_ms)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (workstation, software_name, mount_point, is_accessible,
-                  0))
-            
-            conn.commit()
+        row = (timestamp, workstation, software_name, mount_point, is_accessible,
+               check_time_ms)
+        
+        self._queue('software', [row])
     
-    def store_off_hours_issue(self, issue_details: str):
+    def store_off_hours_issue(self, workstation: str, issue_type: str, details: str):
         """
         Store issues detected during off-hours for later notification.
         
         Args:
-            issue_details: Description of the issue
+            workstation: Hostname, or 'unknown'
+            issue_type: mount_failure, connectivity or general
+            details: Description of the issue
         """
-        with self._get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Parse issue details to extract workstation and type
-            workstation = 'unknown'
-            issue_type = 'general'
-            
-            # Simple parsing
-            if ':' in issue_details:
-                parts = issue_details.split(':', 1)
-                workstation = parts[0].strip()
-                
-                if 'mount' in issue_details.lower():
-                    issue_type = 'mount_failure'
-                elif 'ssh' in issue_details.lower() or 'connect' in issue_details.lower():
-                    issue_type = 'connectivity'
-            
-            cursor.execute('''
-                INSERT INTO off_hours_issues
-                (workstation, issue_type, details)
-                VALUES (?, ?, ?)
-            ''', (workstation, issue_type, issue_details))
-            
-            conn.commit()
+        self.store_off_hours_issues([(workstation, issue_type, details)])
+    
+    def store_off_hours_issues(self, issues: List[Tuple[str, str, str]]):
+        """
+        Store several off-hours issues in one transaction, or with the
+        open batch() if there is one.
+        
+        Args:
+            issues: (workstation, issue_type, details) tuples
+        """
+        if not issues:
+            return
+        
+        self._queue('off_hours', list(issues))
     
     def get_off_hours_issues(self) -> List[Tuple]:
         """
         Get all unnotified off-hours issues.
         
         Returns:
-            List of (id, workstation, issue_type, details, detected_at) tuples
+            List of sqlite3.Row with id, workstation, issue_type, details and
+            detected_at, readable by name
         """
         with self._get_connection() as conn:
             cursor = conn.cursor()
@@ -292,18 +807,53 @@ class NASMonitorDB:
             
             return cursor.fetchall()
     
-    def clear_off_hours_issues(self):
-        """Mark all off-hours issues as notified."""
+    def clear_off_hours_issues(self, up_to_id: int = None) -> int:
+        """
+        Mark off-hours issues as notified.
+        
+        Args:
+            up_to_id: Only mark issues with id <= up_to_id, so that ones
+                stored after the summary was read are kept for the next one
+            
+        Returns:
+            Number of issues marked
+        """
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
             cursor.execute('''
                 UPDATE off_hours_issues
                 SET notified = 1
-                WHERE notified = 0
-            ''')
+                WHERE notified = 0 AND (? IS NULL OR id <= ?)
+            ''', (up_to_id, up_to_id))
             
-            conn.commit()
+            self._commit(conn)
+            return cursor.rowcount
+    
+    @staticmethod
+    def _delete_before(cursor: sqlite3.Cursor, table: str, cutoff) -> int:
+        """
+        Delete rows of an append-only check table older than cutoff.
+        
+        Rows go in in time order, so the expired ones are a prefix of the
+        table by rowid. Find where it ends with one timestamp index probe
+        and delete that rowid range, walking the table in storage order
+        rather than looking each row up from the index. The timestamp
+        test stays in (unary + keeps it off the index) in case the clock
+        was ever stepped back.
+        """
+        first_kept = cursor.execute(
+            f'SELECT rowid FROM {table} WHERE timestamp >= ? ORDER BY timestamp LIMIT 1',
+            (cutoff,)
+        ).fetchone()
+        if first_kept is None:
+            cursor.execute(f'DELETE FROM {table} WHERE timestamp < ?', (cutoff,))
+        else:
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid < ? AND +timestamp < ?',
+                (first_kept[0], cutoff)
+            )
+        return cursor.rowcount
     
     def cleanup_old_records(self, keep_hours: int = None) -> Tuple[int, int, int]:
         """
@@ -313,32 +863,27 @@ class NASMonitorDB:
             keep_hours: Hours of history to keep (from config if not specified)
             
         Returns:
-            Tuple of (mount_records_deleted, software_records_deleted, failure_records_deleted)
+            Tuple of (mount_records_deleted, software_records_deleted,
+            failure_records_deleted), the last including resolved
+            connectivity issues and notified off-hours issues
         """
-        with self._get_connection() as conn:
+        # Get keep_hours from config if not specified
+        if keep_hours is None:
+            keep_hours = self.get_config()['keep_hours']
+        
+        # All the deletes share one write transaction, and one commit
+        with self.transaction() as conn:
             cursor = conn.cursor()
             
-            # Get keep_hours from config if not specified
-            if keep_hours is None:
-                cursor.execute('SELECT keep_hours FROM monitor_config WHERE id = 1')
-                result = cursor.fetchone()
-                keep_hours = result[0] if result else 168  # Default to 7 days
-            
-            cutoff_time = datetime.datetime.now() - datetime.timedelta(hours=keep_hours)
-            
-            # Delete old mount status records
-            cursor.execute('''
-                DELETE FROM workstation_mount_status
-                WHERE timestamp < ?
-            ''', (cutoff_time,))
-            mount_deleted = cursor.rowcount
+            # Timestamps are stored in UTC by CURRENT_TIMESTAMP; have SQLite
+            # work out the cutoff in the same form, once for every table
+            cutoff_time = cursor.execute(
+                "SELECT datetime('now', ?)", (hours_ago(keep_hours),)
+            ).fetchone()[0]
             
-            # Delete old software checks
-            cursor.execute('''
-                DELETE FROM software_availability
-                WHERE timestamp < ?
-            ''', (cutoff_time,))
-            software_deleted = cursor.rowcount
+            # Delete old mount status records and software checks
+            mount_deleted = self._delete_before(cursor, 'workstation_mount_status', cutoff_time)
+            software_deleted = self._delete_before(cursor, 'software_availability', cutoff_time)
             
             # Delete old resolved connectivity issues
             cursor.execute('''
@@ -354,9 +899,31 @@ class NASMonitorDB:
             ''', (cutoff_time,))
             failures_deleted = cursor.rowcount
             
-            conn.commit()
+            # Delete off-hours issues already sent in a summary
+            cursor.execute('''
+                DELETE FROM off_hours_issues
+                WHERE notified = 1 AND detected_at < ?
+            ''', (cutoff_time,))
+            failures_deleted += cursor.rowcount
+            
+            # Shrink the file by what the deletes freed, without rewriting
+            # the rest of it as VACUUM would. The pragma frees a page per
+            # step, so fetch it to completion (executescript() would too,
+            # but it commits the transaction)
+            conn.execute(f'PRAGMA incremental_vacuum({INCREMENTAL_VACUUM_PAGES})').fetchall()
             
-            return mount_deleted, software_deleted, failures_deleted + conn_deleted
+            # Keep the planner's index statistics current as the tables
+            # grow and shrink; this only runs ANALYZE where it is due
+            conn.execute('PRAGMA optimize')
+        
+        # The shared connection never closes, so the -wal file would stay
+        # at its largest size; reset it once the deletes are in the
+        # database. Not possible inside a caller's transaction()
+        if self.journal_mode == 'wal' and not self._owns_transaction():
+            with self._get_connection() as conn:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)').fetchall()
+        
+        return mount_deleted, software_deleted, failures_deleted + conn_deleted
     
     def get_recent_connectivity_issues(self, hours: int = 24) -> List[Dict[str, Any]]:
         """
@@ -371,30 +938,19 @@ class NASMonitorDB:
         with self._get_connection() as conn:
             cursor = conn.cursor()
             
-            since_time = datetime.datetime.now() - datetime.timedelta(hours=hours)
-            
+            # Stored timestamps are UTC, as is SQLite's 'now'
             cursor.execute('''
                 SELECT workstation, issue_type, error_message, timestamp,
                        resolved, resolved_at, duration_minutes
                 FROM connectivity_issues
-                WHERE timestamp > ?
+                WHERE timestamp > datetime('now', ?)
                 ORDER BY timestamp DESC
-            ''', (since_time,))
-            
-            results = []
-            for row in cursor.fetchall():
-                results.append({
-                    'workstation': row['workstation'],
-                    'issue_type': row['issue_type'],
-                    'error_message': row['error_message'],
-                    'timestamp': row['timestamp'],
-                    'resolved': bool(row['resolved']),
-                    'resolved_at': row['resolved_at'],
-                    'duration_minutes': row['duration_minutes']
-                })
-            
-            return results
-
+            ''', (hours_ago(hours),))
+            
+            # The selected columns are the dict keys; only resolved needs
+            # converting
+            return [dict(row, resolved=bool(row['resolved'])) for row in cursor]
+    
     def get_current_status(self) -> List[Tuple]:
         """
         Get current status of all workstations from the most recent check.
@@ -404,13 +960,13 @@ class NASMonitorDB:
                            active_users, is_online, user_list)
         """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
+            # Latest row by id, not timestamp: a remount records its
+            # newly_mounted row with the same cycle timestamp as the
+            # not_mounted row before it
             query = """
                 WITH latest_checks AS (
-                    SELECT 
-                        workstation,
-                        mount_point,
-                        MAX(timestamp) as latest_timestamp
+                    SELECT MAX(id) as latest_id
                     FROM workstation_mount_status
                     GROUP BY workstation, mount_point
                 )
@@ -424,9 +980,7 @@ class NASMonitorDB:
                     ws.user_list
                 FROM workstation_mount_status wms
                 INNER JOIN latest_checks lc 
-                    ON wms.workstation = lc.workstation 
-                    AND wms.mount_point = lc.mount_point
-                    AND wms.timestamp = lc.latest_timestamp
+                    ON wms.id = lc.latest_id
                 LEFT JOIN workstation_status ws
                     ON wms.workstation = ws.workstation
                 ORDER BY wms.workstation, wms.mount_point;
@@ -434,91 +988,160 @@ class NASMonitorDB:
             cursor.execute(query)
             return cursor.fetchall()
 
-    def get_config(self) -> Dict[str, Any]:
-        """Get database configuration settings."""
+    def get_config(self, force_reload: bool = False) -> Dict[str, Any]:
+        """
+        Get database configuration settings, cached for CONFIG_CACHE_TTL
+        seconds (force_reload reads the table regardless).
+        """
+        cached = self._config_cache
+        if cached and not force_reload and cached[1] > time.monotonic():
+            return dict(cached[0])
+        
+        # One scalar row; fetched straight off the connection
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT keep_hours, aggressive_cleanup FROM monitor_config WHERE id = 1')
-            row = cursor.fetchone()
-            if row:
-                return {
-                    'keep_hours': row['keep_hours'],
-                    'aggressive_cleanup': bool(row['aggressive_cleanup'])
-                }
-            return {'keep_hours': 168, 'aggressive_cleanup': False}
+            row = conn.execute(
+                'SELECT keep_hours, aggressive_cleanup FROM monitor_config WHERE id = 1'
+            ).fetchone()
+        if row:
+            config = {
+                'keep_hours': row['keep_hours'],
+                'aggressive_cleanup': bool(row['aggressive_cleanup'])
+            }
+        else:
+            config = {'keep_hours': DEFAULT_KEEP_HOURS, 'aggressive_cleanup': False}
+        
+        self._config_cache = (config, time.monotonic() + CONFIG_CACHE_TTL)
+        return dict(config)
+    
+    def update_config(self, keep_hours: int, aggressive_cleanup: bool):
+        """
+        Set the retention settings in monitor_config.
+        
+        Args:
+            keep_hours: Hours of history to keep (1-720)
+            aggressive_cleanup: Whether to clean up aggressively
+        """
+        with self._get_connection() as conn:
+            conn.execute('''
+                INSERT INTO monitor_config (id, keep_hours, aggressive_cleanup)
+                VALUES (1, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    keep_hours = excluded.keep_hours,
+                    aggressive_cleanup = excluded.aggressive_cleanup
+            ''', (keep_hours, int(bool(aggressive_cleanup))))
+            self._commit(conn)
+        
+        # Write through, so this process sees the change at once
+        self._config_cache = ({'keep_hours': keep_hours,
+                               'aggressive_cleanup': bool(aggressive_cleanup)},
+                              time.monotonic() + CONFIG_CACHE_TTL)
 
     def get_unresolved_failures(self) -> List[Tuple]:
         """Get all unresolved mount failures."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             cursor.execute('SELECT * FROM unresolved_failures')
             return cursor.fetchall()
 
     def get_recent_failures(self) -> List[Tuple]:
         """Get summary of recent failures (last 24 hours)."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             cursor.execute('SELECT * FROM recent_failure_summary')
             return cursor.fetchall()
 
     def get_reliability(self) -> List[Tuple]:
-        """Get 7-day reliability statistics for all workstations."""
+        """
+        Get 7-day reliability statistics for all workstations, as of the
+        monitor's last cycle (computed live if it has not run yet).
+        """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute('SELECT * FROM workstation_reliability ORDER BY workstation')
-            return cursor.fetchall()
+            cursor = self._tuple_cursor(conn)
+            cursor.execute('''
+                SELECT workstation, total_checks, successful_checks, failed_checks,
+                       success_rate, last_check
+                FROM workstation_reliability_cache ORDER BY workstation
+            ''')
+            rows = cursor.fetchall()
+            if not rows:
+                cursor.execute('SELECT * FROM workstation_reliability ORDER BY workstation')
+                rows = cursor.fetchall()
+            return rows
 
     def get_software_summary(self) -> List[Tuple]:
         """Get software availability summary (last 7 days)."""
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            cursor = self._tuple_cursor(conn)
             cursor.execute('SELECT * FROM software_summary')
             return cursor.fetchall()
 
-    def get_workstation_detail(self, workstation: str, hours: int = 24) -> Dict[str, Any]:
-        """Get detailed history for a specific workstation."""
+    MOUNT_HISTORY = '''
+        SELECT 
+            mount_point,
+            status,
+            timestamp,
+            error_message
+        FROM workstation_mount_status
+        WHERE workstation = ? AND timestamp > datetime('now', ?)
+        ORDER BY timestamp DESC
+    '''
+    
+    CURRENT_STATUS = '''
+        SELECT 
+            is_online,
+            active_users,
+            user_list,
+            last_seen
+        FROM workstation_status
+        WHERE workstation = ?
+    '''
+    
+    MOUNT_FAILURE_HISTORY = '''
+        SELECT 
+            mount_point,
+            first_failure,
+            last_failure,
+            failure_count,
+            resolved
+        FROM mount_failures
+        WHERE workstation = ? AND first_failure > datetime('now', ?)
+        ORDER BY first_failure DESC
+    '''
+    
+    def iter_workstation_detail(self, workstation: str, hours: int = 24) -> Iterator[sqlite3.Row]:
+        """
+        Yield a workstation's mount history row by row, newest first,
+        without building the whole list. The connection (and the lock)
+        is held until the generator is exhausted or closed.
+        """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
-            since_time = datetime.datetime.now() - datetime.timedelta(hours=hours)
+            yield from conn.execute(self.MOUNT_HISTORY, (workstation, hours_ago(hours)))
+    
+    def get_workstation_detail(self, workstation: str, hours: int = 24,
+                               include_history: bool = True) -> Dict[str, Any]:
+        """
+        Get detailed history for a specific workstation. With
+        include_history=False the mount history is left out, for callers
+        that stream it with iter_workstation_detail instead.
+        """
+        with self._get_connection() as conn:
+            cursor = self._tuple_cursor(conn)
+            # Timestamps are stored in UTC, so compare against SQLite's
+            # 'now' rather than the local clock
+            since = hours_ago(hours)
             
             # Get mount history
-            cursor.execute('''
-                SELECT 
-                    mount_point,
-                    status,
-                    timestamp,
-                    error_message
-                FROM workstation_mount_status
-                WHERE workstation = ? AND timestamp > ?
-                ORDER BY timestamp DESC
-            ''', (workstation, since_time))
-            mount_history = cursor.fetchall()
+            mount_history = []
+            if include_history:
+                cursor.execute(self.MOUNT_HISTORY, (workstation, since))
+                mount_history = cursor.fetchall()
             
             # Get current status
-            cursor.execute('''
-                SELECT 
-                    is_online,
-                    active_users,
-                    user_list,
-                    last_seen
-                FROM workstation_status
-                WHERE workstation = ?
-            ''', (workstation,))
+            cursor.execute(self.CURRENT_STATUS, (workstation,))
             current_status = cursor.fetchone()
             
             # Get failures
-            cursor.execute('''
-                SELECT 
-                    mount_point,
-                    
-                    first_failure,
-                    last_failure,
-                    failure_count,
-                    resolved
-                FROM mount_failures
-                WHERE workstation = ? AND first_failure > ?
-                ORDER BY first_failure DESC
-            ''', (workstation, since_time))
+            cursor.execute(self.MOUNT_FAILURE_HISTORY, (workstation, since))
             failures = cursor.fetchall()
             
             return {
@@ -529,5 +1152,12 @@ class NASMonitorDB:
             }
 
     def close(self):
-        """Close database connection. No-op since we use context managers."""
-        pass
+        """Close the shared database connection; the next call reopens it."""
+        self._wait_for_writes()
+        if self._writer is not None:
+            self._writer.shutdown()
+            self._writer = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -3,6 +3,9 @@
 -- Enhanced with connectivity issue tracking
 -- =====================================================================
 
+-- Must come before the first table; lets cleanup free space incrementally
+PRAGMA auto_vacuum = INCREMENTAL;
+
 -- Configuration table
 CREATE TABLE IF NOT EXISTS monitor_config (
     id INTEGER PRIMARY KEY CHECK (id=1),
@@ -39,9 +42,10 @@ CREATE TABLE IF NOT EXISTS workstation_status (
     last_check DATETIME,
     last_connectivity_issue DATETIME,
     active_users INTEGER DEFAULT 0,
-    user_list TEXT,
+    user_list TEXT,  -- comma-separated distinct logins, NULL if none
     mount_status TEXT,  -- healthy, issues, unknown
     checked_by TEXT,
+    last_seen DATETIME,
     last_successful_check DATETIME
 );
 
@@ -63,7 +67,7 @@ CREATE TABLE IF NOT EXISTS software_availability (
     timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
     workstation TEXT NOT NULL,
     software_name TEXT NOT NULL,
-    software_path TEXT NOT NULL,
+    mount_point TEXT,
     is_accessible INTEGER CHECK (is_accessible IN (0, 1)),
     check_time_ms REAL,
     error_message TEXT
@@ -109,11 +113,17 @@ CREATE INDEX IF NOT EXISTS idx_mount_timestamp
 CREATE INDEX IF NOT EXISTS idx_software_time
     ON software_availability(workstation, timestamp);
 
+-- cleanup_old_records() deletes software checks by age alone
+CREATE INDEX IF NOT EXISTS idx_software_timestamp
+    ON software_availability(timestamp);
+
 CREATE INDEX IF NOT EXISTS idx_mount_failures
     ON mount_failures(workstation, resolved, last_failure);
 
-CREATE INDEX IF NOT EXISTS idx_off_hours
-    ON off_hours_issues(notified, detected_at);
+-- Only unnotified issues are ever looked up; notified ones drop out of
+-- the index and are purged by cleanup_old_records()
+CREATE INDEX IF NOT EXISTS idx_off_hours_pending
+    ON off_hours_issues(detected_at) WHERE notified = 0;
 
 -- NEW: Index for connectivity issues
 CREATE INDEX IF NOT EXISTS idx_connectivity_workstation_time
@@ -122,6 +132,10 @@ CREATE INDEX IF NOT EXISTS idx_connectivity_workstation_time
 CREATE INDEX IF NOT EXISTS idx_connectivity_unresolved
     ON connectivity_issues(resolved, workstation);
 
+-- One open issue per workstation; record_connectivity_issue() upserts it
+CREATE UNIQUE INDEX IF NOT EXISTS idx_connectivity_open
+    ON connectivity_issues(workstation) WHERE resolved = 0;
+
 -- =====================================================================
 -- Views for common queries
 -- =====================================================================
@@ -185,6 +199,19 @@ FROM workstation_mount_status
 WHERE timestamp > datetime('now', '-7 days')
 GROUP BY workstation;
 
+-- workstation_reliability, materialized by the monitor at the end of each
+-- cycle so reports read one row per workstation instead of aggregating
+-- seven days of checks
+CREATE TABLE IF NOT EXISTS workstation_reliability_cache (
+    workstation TEXT PRIMARY KEY,
+    total_checks INTEGER,
+    successful_checks INTEGER,
+    failed_checks INTEGER,
+    success_rate REAL,
+    last_check DATETIME,
+    refreshed_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
 -- =====================================================================
 -- Triggers for automatic actions
 -- =====================================================================
@@ -240,6 +267,7 @@ SELECT
     END as action_needed,
     last_check,
     last_connectivity_issue
+FROM workstation_status;
 
 -- View: Unresolved mount failures
 CREATE VIEW IF NOT EXISTS unresolved_failures AS
@@ -273,8 +301,8 @@ CREATE VIEW IF NOT EXISTS software_summary AS
         workstation,
         software_name,
         COUNT(*) AS total_checks,
-        SUM(CASE WHEN available = 1 THEN 1 ELSE 0 END) AS accessible_count,
-        SUM(CASE WHEN available = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS availability_pct,
+        SUM(CASE WHEN is_accessible = 1 THEN 1 ELSE 0 END) AS accessible_count,
+        SUM(CASE WHEN is_accessible = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*) AS availability_pct,
         MAX(timestamp) AS last_check
     FROM software_availability
     WHERE timestamp >= datetime('now', '-7 days')
@@ -24,22 +24,32 @@ if sys.version_info < min_py:
 import argparse
 import contextlib
 import getpass
+import io
+import json
 import logging
+import time
+import types
 from datetime import datetime
 
 ###
 # Installed libraries
 ###
-try:
-    import pandas
-    use_pandas = True
-except:
-    use_pandas = False
+# pandas is never imported here; it is only needed to pretty-print results
+# that are already DataFrames, and costs far more to load than the rest
+# of the tool
+def _is_dataframe(obj) -> bool:
+    """
+    True if obj is a pandas DataFrame. Nothing can have produced one
+    unless pandas is already loaded, so this never imports it.
+    """
+    pandas = sys.modules.get('pandas')
+    return pandas is not None and isinstance(obj, pandas.DataFrame)
 
 ###
 # From hpclib (git submodule)
 ###
-import linuxutils
+# linuxutils (which loads dateutil, ctypes and more) is only needed for
+# --verbose, and is imported there
 from urdecorators import show_exceptions_and_frames as trap
 from urlogger import URLogger
 
@@ -69,6 +79,123 @@ myconfig = None
 logger = None
 db = None
 
+###
+# Query result cache
+###
+# Results of the read-only queries, kept between runs so that repeating a
+# command (refreshing status during an incident) skips the view work.
+# JSON rather than pickle: rows come back as lists, which the show_*
+# functions index the same way, and loading it cannot run code
+QUERY_CACHE_FILE = os.path.join(os.path.expanduser('~'), '.cache', 'nas_query.json')
+
+# Seconds a cached result is used, by NASMonitorDB method
+QUERY_CACHE_TTL = {
+    'get_current_status': 30,
+    'get_unresolved_failures': 30,
+    'get_recent_failures': 30,
+    'get_workstation_detail': 30,
+    'get_reliability': 300,
+    'get_software_summary': 300,
+}
+
+# {'stamp': database stamp, 'entries': {key: [expiry, result]}}, loaded
+# by the first cached_query()
+_query_cache = None
+_query_cache_dirty = False
+
+
+def _database_stamp(path: str) -> list:
+    """
+    Modification time and size of the database and its WAL. Any write
+    (the monitor's next cycle, cleanup, update-config) changes one of
+    them, which throws the whole cache away.
+    """
+    stamp = []
+    for name in (path, path + '-wal'):
+        try:
+            st = os.stat(name)
+            stamp.extend((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamp.extend((None, None))
+    return stamp
+
+
+def cached_query(method: str, *args) -> Any:
+    """
+    db.<method>(*args), reusing a result cached within the last
+    QUERY_CACHE_TTL[method] seconds while the database is unchanged.
+    """
+    global _query_cache, _query_cache_dirty
+
+    stamp = _database_stamp(myconfig.database)
+    if _query_cache is None:
+        try:
+            with open(QUERY_CACHE_FILE) as f:
+                _query_cache = json.load(f)
+        except (OSError, ValueError):
+            _query_cache = {}
+    if _query_cache.get('stamp') != stamp:
+        _query_cache = {'stamp': stamp, 'entries': {}}
+
+    key = json.dumps([method, args])
+    now = time.time()
+    hit = _query_cache['entries'].get(key)
+    if hit and hit[0] > now:
+        return hit[1]
+
+    result = getattr(db, method)(*args)
+    try:
+        # Round-trip now, so a hit and a miss look the same to the caller
+        result = json.loads(json.dumps(result))
+    except TypeError:
+        return result
+    _query_cache['entries'][key] = [now + QUERY_CACHE_TTL[method], result]
+    _query_cache_dirty = True
+    return result
+
+
+###
+# Plain-text table rows
+###
+# Row templates, parsed once rather than as an f-string per row; the
+# show_* functions hand whole tables to _write_rows()
+_STATUS_ROW = "{:<15} {:<25} {:<10} {:<8} {:<6} {:<30}".format
+_FAILURE_ROW = "{:<15} {:<25} {:<20} {:<6} {:<6.1f}".format
+_FAILURE_HISTORY_ROW = "{:<12} {:<25} {:<20} {:<20} {:<10}".format
+_RECENT_ROW = "{:<15} {:<10} {:<15} {:<20}".format
+_RELIABILITY_ROW = "{:<15} {:<13} {:<12} {:<12.1f}%".format
+_SOFTWARE_ROW = "{:<15} {:<25} {:<8} {:<11} {:<8.1f}%".format
+_HISTORY_ROW = "{:<20} {:<25} {:<10} {:<30}".format
+_DETAIL_FAILURE_ROW = "{:<25} {:<20} {:<20} {:<6}".format
+
+
+def _write_rows(lines: Iterable[str]) -> None:
+    """Write table rows with a single write() instead of a print() each."""
+    sys.stdout.write(''.join(f"{line}\n" for line in lines))
+
+
+def _write_frame(frame) -> None:
+    """Have a DataFrame write its table to stdout itself, not via print()."""
+    frame.to_string(buf=sys.stdout, index=False)
+    sys.stdout.write("\n")
+
+
+def save_query_cache() -> None:
+    """Write the cache back if this run added to it; failures are ignored."""
+    if not _query_cache_dirty:
+        return
+    now = time.time()
+    _query_cache['entries'] = {key: hit for key, hit in _query_cache['entries'].items()
+                               if hit[0] > now}
+    try:
+        os.makedirs(os.path.dirname(QUERY_CACHE_FILE), exist_ok=True)
+        tmp = f"{QUERY_CACHE_FILE}.{os.getpid()}"
+        with open(tmp, 'w') as f:
+            json.dump(_query_cache, f)
+        os.replace(tmp, QUERY_CACHE_FILE)
+    except OSError as e:
+        logger.debug(f"Could not save query cache: {e}")
+
 
 @trap
 def load_config(config_path: str) -> object:
@@ -85,16 +212,14 @@ def load_config(config_path: str) -> object:
     with open(config_path, 'rb') as f:
         config_dict = tomllib.load(f)
 
-    # Convert dict to object for dot notation
-    class Config:
-        def __init__(self, d):
-            for key, value in d.items():
-                if isinstance(value, dict):
-                    setattr(self, key, Config(value))
-                else:
-                    setattr(self, key, value)
+    # Convert nested tables to SimpleNamespace for dot notation
+    def to_namespace(d: dict) -> types.SimpleNamespace:
+        return types.SimpleNamespace(**{
+            key: to_namespace(value) if isinstance(value, dict) else value
+            for key, value in d.items()
+        })
 
-    return Config(config_dict)
+    return to_namespace(config_dict)
 
 
 @trap
@@ -142,16 +267,16 @@ def show_status() -> None:
     print("CURRENT WORKSTATION STATUS")
     print("=" * 70 + "\n")
 
-    status = db.get_current_status()
+    status = cached_query('get_current_status')
 
-    if use_pandas and isinstance(status, pandas.DataFrame):
-        print(status.to_string(index=False))
+    if _is_dataframe(status):
+        _write_frame(status)
     else:
         print(f"{'Workstation':<15} {'Mount':<25} {'Status':<10} {'Online':<8} {'Users':<6} {'User List':<30}")
         print("-" * 106)
-        for row in status:
-            user_list = row[6] if len(row) > 6 and row[6] else ''
-            print(f"{row[0]:<15} {row[1]:<25} {row[3]:<10} {row[5]:<8} {row[4]:<6} {user_list:<30}")
+        _write_rows(_STATUS_ROW(row[0], row[1], row[3], row[5], row[4],
+                                row[6] if len(row) > 6 and row[6] else '')
+                    for row in status)
 
     print()
 
@@ -165,20 +290,20 @@ def show_failures() -> None:
     print("UNRESOLVED MOUNT FAILURES")
     print("=" * 70 + "\n")
 
-    failures = db.get_unresolved_failures()
-    if use_pandas and isinstance(failures, pandas.DataFrame):
+    failures = cached_query('get_unresolved_failures')
+    if _is_dataframe(failures):
         if failures.empty:
             print("No unresolved failures found.")
         else:
-            print(failures.to_string(index=False))
+            _write_frame(failures)
     else:
         if not failures:
             print("No unresolved failures found.")
         else:
             print(f"{'Workstation':<15} {'Mount Point':<25} {'First Failure':<20} {'Count':<6} {'Days':<6}")
             print("-" * 70)
-            for row in failures:
-                print(f"{row[0]:<15} {row[1]:<25} {row[2]:<20} {row[4]:<6} {row[5]:<6.1f}")
+            _write_rows(_FAILURE_ROW(row[0], row[1], row[2], row[4], row[5])
+                        for row in failures)
 
     # Show recent failures (last 7 days)
     print("\n" + "=" * 70)
@@ -212,6 +337,7 @@ def show_failures() -> None:
         print(f"{'Workstation':<12} {'Mount Point':<25} {'Failed At':<20} {'Resolved At':<20} {'Duration':<10}")
         print("-" * 100)
 
+        lines = []
         for r in recent:
             # Extract values from tuple (in order returned by SQL)
             ws = r[0]              # workstation
@@ -246,7 +372,8 @@ def show_failures() -> None:
             else:
                 duration = "Ongoing"
 
-            print(f"{ws:<12} {mount:<25} {failed:<20} {resolved_text:<20} {duration:<10}")
+            lines.append(_FAILURE_HISTORY_ROW(ws, mount, failed, resolved_text, duration))
+        _write_rows(lines)
 
     print()
 
@@ -260,21 +387,21 @@ def show_recent_failures() -> None:
     print("RECENT FAILURES (Last 24 Hours)")
     print("=" * 70 + "\n")
 
-    failures = db.get_recent_failures()
+    failures = cached_query('get_recent_failures')
 
-    if use_pandas and isinstance(failures, pandas.DataFrame):
+    if _is_dataframe(failures):
         if failures.empty:
             print("No recent failures found.")
         else:
-            print(failures.to_string(index=False))
+            _write_frame(failures)
     else:
         if not failures:
             print("No recent failures found.")
         else:
             print(f"{'Workstation':<15} {'Failures':<10} {'Affected Mounts':<15} {'Latest':<20}")
             print("-" * 70)
-            for row in failures:
-                print(f"{row[0]:<15} {row[1]:<10} {row[2]:<15} {row[4]:<20}")
+            _write_rows(_RECENT_ROW(row[0], row[1], row[2], row[4])
+                        for row in failures)
 
     print()
 
@@ -288,15 +415,15 @@ def show_reliability() -> None:
     print("WORKSTATION RELIABILITY (7 Days)")
     print("=" * 70 + "\n")
 
-    reliability = db.get_reliability()
+    reliability = cached_query('get_reliability')
 
-    if use_pandas and isinstance(reliability, pandas.DataFrame):
-        print(reliability.to_string(index=False))
+    if _is_dataframe(reliability):
+        _write_frame(reliability)
     else:
         print(f"{'Workstation':<15} {'Total Checks':<13} {'Successful':<12} {'Success Rate':<12}")
         print("-" * 70)
-        for row in reliability:
-            print(f"{row[0]:<15} {row[1]:<13} {row[2]:<12} {row[3]:<12.1f}%")
+        _write_rows(_RELIABILITY_ROW(row[0], row[1], row[2], row[3])
+                    for row in reliability)
 
     print()
 
@@ -310,21 +437,21 @@ def show_software() -> None:
     print("SOFTWARE AVAILABILITY (7 Days)")
     print("=" * 70 + "\n")
 
-    software = db.get_software_summary()
+    software = cached_query('get_software_summary')
 
-    if use_pandas and isinstance(software, pandas.DataFrame):
+    if _is_dataframe(software):
         if software.empty:
             print("No software checks found.")
         else:
-            print(software.to_string(index=False))
+            _write_frame(software)
     else:
         if not software:
             print("No software checks found.")
         else:
             print(f"{'Software':<15} {'Mount Point':<25} {'Checks':<8} {'Available':<11} {'Rate':<8}")
             print("-" * 70)
-            for row in software:
-                print(f"{row[0]:<15} {row[1]:<25} {row[2]:<8} {row[3]:<11} {row[4]:<8.1f}%")
+            _write_rows(_SOFTWARE_ROW(row[0], row[1], row[2], row[3], row[4])
+                        for row in software)
 
     print()
 
@@ -338,21 +465,25 @@ def show_workstation_detail(workstation: str, hours: int = 24) -> None:
     print(f"WORKSTATION DETAIL: {workstation} (Last {hours} hours)")
     print("=" * 70 + "\n")
 
-    detail = db.get_workstation_detail(workstation, hours)
+    # The mount history can run to thousands of rows; print it as it is
+    # read rather than loading it all first
+    found = False
+    for row in db.iter_workstation_detail(workstation, hours):
+        if not found:
+            print(f"{'Timestamp':<20} {'Mount Point':<25} {'Status':<10} {'Error':<30}")
+            print("-" * 90)
+            found = True
+        # row is: (mount_point, status, timestamp, error_message)
+        timestamp = row[2] if len(row) > 2 else ''
+        mount_point = row[0] if len(row) > 0 else ''
+        status = row[1] if len(row) > 1 else ''
+        error = row[3] if len(row) > 3 and row[3] else ''
+        print(_HISTORY_ROW(timestamp, mount_point, status, error))
+    if not found:
+        print(f"No mount history found for {workstation}")
     
     # detail is a dictionary with keys: mount_history, current_status, failures
-    if not detail or not detail.get('mount_history'):
-        print(f"No mount history found for {workstation}")
-    else:
-        print(f"{'Timestamp':<20} {'Mount Point':<25} {'Status':<10} {'Error':<30}")
-        print("-" * 90)
-        for row in detail['mount_history']:
-            # row is: (mount_point, status, timestamp, error_message)
-            timestamp = row[2] if len(row) > 2 else ''
-            mount_point = row[0] if len(row) > 0 else ''
-            status = row[1] if len(row) > 1 else ''
-            error = row[3] if len(row) > 3 and row[3] else ''
-            print(f"{timestamp:<20} {mount_point:<25} {status:<10} {error:<30}")
+    detail = cached_query('get_workstation_detail', workstation, hours, False)
     
     # Show current status
     if detail.get('current_status'):
@@ -372,9 +503,9 @@ def show_workstation_detail(workstation: str, hours: int = 24) -> None:
         print("-" * 70)
         print(f"{'Mount Point':<25} {'First Failure':<20} {'Last Failure':<20} {'Count':<6}")
         print("-" * 75)
-        for f in detail['failures']:
-            # f is: (mount_point, first_failure, last_failure, failure_count, resolved)
-            print(f"{f[0]:<25} {f[1]:<20} {f[2]:<20} {f[3]:<6}")
+        # f is: (mount_point, first_failure, last_failure, failure_count, resolved)
+        _write_rows(_DETAIL_FAILURE_ROW(f[0], f[1], f[2], f[3])
+                    for f in detail['failures'])
 
     print()
 
@@ -426,6 +557,40 @@ def cleanup_database(confirm: bool = False) -> None:
     print(f"  Failure records: {failures_deleted}")
 
 
+@trap
+def show_dashboard() -> None:
+    """
+    Show status, failures and recent failures together. The three reports
+    share one connection and one read transaction, so they come from the
+    same snapshot and warm the page cache once, and the whole dashboard
+    goes to stdout in a single write.
+    """
+    global db
+
+    # The show_* functions are @trap-wrapped, and trap exits on an
+    # exception; write out whatever was buffered before that happened
+    buf = io.StringIO()
+    try:
+        with db.snapshot(), contextlib.redirect_stdout(buf):
+            show_status()
+            show_failures()
+            show_recent_failures()
+    finally:
+        sys.stdout.write(buf.getvalue())
+
+
+# Commands that take no arguments of their own, and what runs them
+NOARG_COMMANDS = {
+    'status': show_status,
+    'failures': show_failures,
+    'recent': show_recent_failures,
+    'reliability': show_reliability,
+    'software': show_software,
+    'config': show_config,
+    'dashboard': show_dashboard,
+}
+
+
 @trap
 def nas_query_main(myargs: argparse.Namespace) -> int:
     """
@@ -441,6 +606,7 @@ def nas_query_main(myargs: argparse.Namespace) -> int:
         recent: Recent failures (last 24 hours)
         reliability: 7-day reliability statistics
         software: Software availability summary
+        dashboard: status, failures and recent in one snapshot
         detail: Detailed history for specific workstation
         config: Show database configuration
         update-config: Modify database configuration
@@ -482,24 +648,14 @@ def nas_query_main(myargs: argparse.Namespace) -> int:
     log_level = logging.DEBUG if myargs.verbose else logging.ERROR
     logger = URLogger(logfile=myconfig.log_file, level=log_level)
 
-    # Initialize database
-    db = NASMonitorDB(myconfig.database)
+    # Initialize database; only update-config and cleanup write to it
+    db = NASMonitorDB(myconfig.database,
+                      read_only=myargs.command not in ('update-config', 'cleanup'))
 
     # Execute command
-    if myargs.command == 'status':
-        show_status()
-
-    elif myargs.command == 'failures':
-        show_failures()
-
-    elif myargs.command == 'recent':
-        show_recent_failures()
-
-    elif myargs.command == 'reliability':
-        show_reliability()
-
-    elif myargs.command == 'software':
-        show_software()
+    show = NOARG_COMMANDS.get(myargs.command)
+    if show:
+        show()
 
     elif myargs.command == 'detail':
         if not myargs.workstation:
@@ -507,9 +663,6 @@ def nas_query_main(myargs: argparse.Namespace) -> int:
             return os.EX_USAGE
         show_workstation_detail(myargs.workstation, myargs.hours)
 
-    elif myargs.command == 'config':
-        show_config()
-
     elif myargs.command == 'update-config':
         update_config(myargs.keep_hours, myargs.aggressive)
 
@@ -520,6 +673,7 @@ def nas_query_main(myargs: argparse.Namespace) -> int:
         print(f"Unknown command: {myargs.command}")
         return os.EX_USAGE
 
+    save_query_cache()
     db.close()
     return os.EX_OK
 
@@ -558,6 +712,9 @@ if __name__ == '__main__':
     # software command
     subparsers.add_parser('software', help='Show software availability')
 
+    # dashboard command
+    subparsers.add_parser('dashboard', help='Show status, failures and recent failures together')
+
     # detail command
     detail_parser = subparsers.add_parser('detail', help='Show workstation detail')
     detail_parser.add_argument('--workstation', type=str, required=True,
@@ -588,7 +745,9 @@ if __name__ == '__main__':
         parser.print_help()
         sys.exit(os.EX_USAGE)
 
-    myargs.verbose and linuxutils.dump_cmdline(myargs)
+    if myargs.verbose:
+        import linuxutils
+        linuxutils.dump_cmdline(myargs)
     if myargs.nice:
         os.nice(myargs.nice)
 